@@ -404,15 +404,12 @@ class MonsterGenerator:
         if pack_name:
             pack_images_path = Path(f'graphic_packs/{pack_name}/monsters')
             if pack_images_path.exists():
-                # Check JPG files
-                for img_file in pack_images_path.glob('*.jpg'):
-                    if not img_file.stem.endswith('_thumb'):
-                        pack_monster_ids.add(img_file.stem)
-                
-                # Check PNG files
-                for img_file in pack_images_path.glob('*.png'):
-                    if not img_file.stem.endswith('_thumb'):
-                        pack_monster_ids.add(img_file.stem)
+                # Single directory pass covering both JPG and PNG files
+                with os.scandir(pack_images_path) as entries:
+                    for entry in entries:
+                        stem, ext = os.path.splitext(entry.name)
+                        if ext in ('.jpg', '.png') and not stem.endswith('_thumb'):
+                            pack_monster_ids.add(stem)
         
         # Add bestiary monsters with correct source classification
         for monster_id, data in self.bestiary.get("monsters", {}).items():
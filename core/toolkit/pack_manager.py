@@ -12,6 +12,7 @@ from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, List
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 
 class PackManager:
     """Service for managing graphic packs"""
@@ -497,105 +498,109 @@ Created: {datetime.now().strftime("%Y-%m-%d")}
         Returns:
             List of pack information dictionaries
         """
-        packs = []
+        pack_dirs = [pack_dir for pack_dir in self.packs_dir.iterdir() if pack_dir.is_dir()]
         
-        for pack_dir in self.packs_dir.iterdir():
-            if pack_dir.is_dir():
-                manifest_path = pack_dir / "manifest.json"
-                
-                if manifest_path.exists():
-                    with open(manifest_path, 'r') as f:
-                        manifest = json.load(f)
-                    
-                    # Calculate pack size
-                    pack_size = sum(
-                        f.stat().st_size for f in pack_dir.rglob('*') if f.is_file()
-                    ) / (1024 * 1024)  # MB
-                    
-                    # Count actual files (supporting both old and new structure)
-                    monsters_dir = pack_dir / "monsters"
-                    npcs_dir = pack_dir / "npcs"
-                    video_count = 0
-                    image_count = 0
-                    thumb_count = 0
-                    npc_count = 0
-                    
-                    # Count NPCs if directory exists
-                    if npcs_dir.exists():
-                        for file in npcs_dir.glob("*"):
-                            if file.is_file():
-                                if file.suffix in [".png", ".jpg", ".jpeg"]:
-                                    if "_thumb" not in file.stem:
-                                        npc_count += 1
-                    
-                    # Also check manifest for NPC count
-                    npc_count = max(
-                        npc_count,
-                        manifest.get("total_npcs", 0),
-                        len(manifest.get("npcs_included", []))
-                    )
-                    
-                    if monsters_dir.exists():
-                        # New structure: everything in monsters/ folder
-                        for file in monsters_dir.glob("*"):
-                            if file.is_file():
-                                if file.suffix == ".mp4":
-                                    video_count += 1
-                                elif file.suffix in [".png", ".jpg", ".jpeg"]:
-                                    if "_thumb" in file.stem or "_thumbnail" in file.stem:
-                                        thumb_count += 1
-                                    else:
-                                        image_count += 1
-                        
-                        # Old structure: separate subdirectories
-                        if (monsters_dir / "videos").exists():
-                            video_count += len(list((monsters_dir / "videos").glob("*.mp4")))
-                        if (monsters_dir / "images").exists():
-                            image_count += len(list((monsters_dir / "images").glob("*")))
-                        if (monsters_dir / "thumbnails").exists():
-                            thumb_count += len(list((monsters_dir / "thumbnails").glob("*")))
-                    
-                    # Determine total monsters (unique count)
-                    monster_count = max(
-                        manifest.get("total_monsters", 0),
-                        len(manifest.get("monsters", {})),
-                        len(manifest.get("monsters_included", [])),
-                        image_count  # Use image count as fallback
-                    )
-                    
-                    packs.append({
-                        "name": pack_dir.name,
-                        "display_name": manifest.get("display_name", manifest.get("name", pack_dir.name)),
-                        "version": manifest.get("version", "1.0.0"),
-                        "author": manifest.get("author", "Unknown"),
-                        "style": manifest.get("style", manifest.get("style_template", "unknown")),
-                        "style_template": manifest.get("style_template", manifest.get("style", "unknown")),
-                        "total_monsters": monster_count,
-                        "total_npcs": npc_count,
-                        "total_videos": video_count,
-                        "monsters_count": monster_count,
-                        "size_mb": round(pack_size, 2),
-                        "created": manifest.get("created_at", manifest.get("created_date", "Unknown")),
-                        "is_active": pack_dir.name == self.active_pack
-                    })
-                else:
-                    # Basic info for packs without manifest
-                    packs.append({
-                        "name": pack_dir.name,
-                        "display_name": pack_dir.name,
-                        "version": "Unknown",
-                        "author": "Unknown",
-                        "style": "unknown",
-                        "total_monsters": 0,
-                        "total_npcs": 0,
-                        "total_videos": 0,
-                        "size_mb": 0,
-                        "created": "Unknown",
-                        "is_active": pack_dir.name == self.active_pack
-                    })
+        # Each pack is an independent directory walk; overlap the filesystem I/O
+        with ThreadPoolExecutor(max_workers=min(8, len(pack_dirs) or 1)) as executor:
+            packs = list(executor.map(self._summarize_pack, pack_dirs))
         
         return sorted(packs, key=lambda x: x["name"])
     
+    def _summarize_pack(self, pack_dir: Path) -> Dict:
+        """Build the list_available_packs entry for a single pack directory"""
+        manifest_path = pack_dir / "manifest.json"
+        
+        if manifest_path.exists():
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            
+            # Calculate pack size
+            pack_size = sum(
+                f.stat().st_size for f in pack_dir.rglob('*') if f.is_file()
+            ) / (1024 * 1024)  # MB
+            
+            # Count actual files (supporting both old and new structure)
+            monsters_dir = pack_dir / "monsters"
+            npcs_dir = pack_dir / "npcs"
+            video_count = 0
+            image_count = 0
+            thumb_count = 0
+            npc_count = 0
+            
+            # Count NPCs if directory exists
+            if npcs_dir.exists():
+                for file in npcs_dir.glob("*"):
+                    if file.is_file():
+                        if file.suffix in [".png", ".jpg", ".jpeg"]:
+                            if "_thumb" not in file.stem:
+                                npc_count += 1
+            
+            # Also check manifest for NPC count
+            npc_count = max(
+                npc_count,
+                manifest.get("total_npcs", 0),
+                len(manifest.get("npcs_included", []))
+            )
+            
+            if monsters_dir.exists():
+                # New structure: everything in monsters/ folder
+                for file in monsters_dir.glob("*"):
+                    if file.is_file():
+                        if file.suffix == ".mp4":
+                            video_count += 1
+                        elif file.suffix in [".png", ".jpg", ".jpeg"]:
+                            if "_thumb" in file.stem or "_thumbnail" in file.stem:
+                                thumb_count += 1
+                            else:
+                                image_count += 1
+                
+                # Old structure: separate subdirectories
+                if (monsters_dir / "videos").exists():
+                    video_count += len(list((monsters_dir / "videos").glob("*.mp4")))
+                if (monsters_dir / "images").exists():
+                    image_count += len(list((monsters_dir / "images").glob("*")))
+                if (monsters_dir / "thumbnails").exists():
+                    thumb_count += len(list((monsters_dir / "thumbnails").glob("*")))
+            
+            # Determine total monsters (unique count)
+            monster_count = max(
+                manifest.get("total_monsters", 0),
+                len(manifest.get("monsters", {})),
+                len(manifest.get("monsters_included", [])),
+                image_count  # Use image count as fallback
+            )
+            
+            return {
+                "name": pack_dir.name,
+                "display_name": manifest.get("display_name", manifest.get("name", pack_dir.name)),
+                "version": manifest.get("version", "1.0.0"),
+                "author": manifest.get("author", "Unknown"),
+                "style": manifest.get("style", manifest.get("style_template", "unknown")),
+                "style_template": manifest.get("style_template", manifest.get("style", "unknown")),
+                "total_monsters": monster_count,
+                "total_npcs": npc_count,
+                "total_videos": video_count,
+                "monsters_count": monster_count,
+                "size_mb": round(pack_size, 2),
+                "created": manifest.get("created_at", manifest.get("created_date", "Unknown")),
+                "is_active": pack_dir.name == self.active_pack
+            }
+        else:
+            # Basic info for packs without manifest
+            return {
+                "name": pack_dir.name,
+                "display_name": pack_dir.name,
+                "version": "Unknown",
+                "author": "Unknown",
+                "style": "unknown",
+                "total_monsters": 0,
+                "total_npcs": 0,
+                "total_videos": 0,
+                "size_mb": 0,
+                "created": "Unknown",
+                "is_active": pack_dir.name == self.active_pack
+            }
+    
     def get_pack_details(self, pack_name: str) -> Optional[Dict]:
         """
         Get detailed information about a specific pack
@@ -465,18 +465,19 @@ class VideoProcessor:
                 "media_stats": {}
             }
         
-        # Update monsters list
-        if monster_id not in manifest.get("monsters_included", []):
-            manifest.setdefault("monsters_included", []).append(monster_id)
-            manifest["monsters_included"] = sorted(manifest["monsters_included"])
+        # Update monsters list (sorted in place; manifests from other tools may not be sorted)
+        monsters_included = manifest.setdefault("monsters_included", [])
+        if monster_id not in monsters_included:
+            monsters_included.append(monster_id)
+            monsters_included.sort()
         
         # Update media stats
         stats = manifest.setdefault("media_stats", {})
-        stats.setdefault(media_type + "s", [])
-        if monster_id not in stats[media_type + "s"]:
-            stats[media_type + "s"].append(monster_id)
+        media_list = stats.setdefault(media_type + "s", [])
+        if monster_id not in media_list:
+            media_list.append(monster_id)
         
-        manifest["total_monsters"] = len(manifest["monsters_included"])
+        manifest["total_monsters"] = len(monsters_included)
         manifest["last_modified"] = datetime.now().strftime("%Y-%m-%d")
         
         # Save updated manifest
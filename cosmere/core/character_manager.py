@@ -3,17 +3,28 @@ Cosmere RPG Character Manager
 Handles character creation, management, and progression
 """
 
+import copy
 import json
 import os
+import threading
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 
 class CosmereCharacterManager:
+    # Top-level fields a client may overwrite; "id" is fixed at creation
+    UPDATABLE_FIELDS = frozenset([
+        "name", "heritage", "path", "origin", "level", "stats", "derived_stats",
+        "talents", "investiture", "equipment", "notes"
+    ])
+    
     def __init__(self, data_dir: str = "cosmere/data"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.characters_dir = self.data_dir / "characters"
         self.characters_dir.mkdir(exist_ok=True)
+        # Write-behind staging: character_id -> latest unsaved character
+        self._pending_saves: Dict[str, Dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
         
     def create_character(self, character_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new Cosmere RPG character"""
@@ -95,24 +106,67 @@ class CosmereCharacterManager:
     
     def load_character(self, character_id: str) -> Optional[Dict[str, Any]]:
         """Load a character by ID"""
+        with self._pending_lock:
+            pending = self._pending_saves.get(character_id)
+            if pending is not None:
+                return copy.deepcopy(pending)
         filepath = self.characters_dir / f"{character_id}.json"
         if filepath.exists():
             with open(filepath, 'r') as f:
                 return json.load(f)
         return None
     
+    def apply_update(self, character: Dict[str, Any], update_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy whitelisted fields from update_data onto character; unknown keys are ignored"""
+        for key in self.UPDATABLE_FIELDS.intersection(update_data):
+            character[key] = update_data[key]
+        return character
+    
     def save_character(self, character: Dict[str, Any]) -> None:
         """Save character data"""
         self._save_character(character)
     
+    def queue_save(self, character: Dict[str, Any]) -> bool:
+        """Stage a character for a deferred save.
+        
+        Returns True if nothing was pending for this character, i.e. the caller
+        should schedule flush_pending(); later calls just replace the staged copy.
+        """
+        with self._pending_lock:
+            first = character["id"] not in self._pending_saves
+            self._pending_saves[character["id"]] = character
+        return first
+    
+    def flush_pending(self, character_id: Optional[str] = None) -> None:
+        """Write staged characters to disk (one character, or all if no ID given)"""
+        with self._pending_lock:
+            if character_id is None:
+                staged = list(self._pending_saves.values())
+                self._pending_saves.clear()
+            else:
+                character = self._pending_saves.pop(character_id, None)
+                staged = [character] if character is not None else []
+            # Write while holding the lock so loads never see an older file
+            for character in staged:
+                self._write_character(character)
+    
     def _save_character(self, character: Dict[str, Any]) -> None:
         """Internal save method"""
+        with self._pending_lock:
+            # This save supersedes any staged copy; a later flush must not overwrite it
+            self._pending_saves.pop(character["id"], None)
+            self._write_character(character)
+    
+    def _write_character(self, character: Dict[str, Any]) -> None:
+        """Write a character file (caller holds _pending_lock)"""
         filepath = self.characters_dir / f"{character['id']}.json"
         with open(filepath, 'w') as f:
             json.dump(character, f, indent=2)
 
     def delete_character(self, character_id: str) -> bool:
         """Delete a character file; returns True if deleted"""
+        with self._pending_lock:
+            self._pending_saves.pop(character_id, None)
         filepath = self.characters_dir / f"{character_id}.json"
         if filepath.exists():
             filepath.unlink()
@@ -162,8 +216,8 @@ class CosmereCharacterManager:
         self._save_character(character)
         return character
     
-    def modify_hp(self, character_id: str, change: int) -> Dict[str, Any]:
-        """Modify character's current HP"""
+    def modify_hp(self, character_id: str, change: int, save: bool = True) -> Dict[str, Any]:
+        """Modify character's current HP (save=False leaves persistence to the caller)"""
         character = self.load_character(character_id)
         if not character:
             raise ValueError(f"Character {character_id} not found")
@@ -172,7 +226,8 @@ class CosmereCharacterManager:
             min(character["derived_stats"]["hp"] + change, 
                 character["derived_stats"]["max_hp"]))
         
-        self._save_character(character)
+        if save:
+            self._save_character(character)
         return character
     
     def add_equipment(self, character_id: str, item: Dict[str, Any]) -> Dict[str, Any]:
@@ -193,14 +248,19 @@ class CosmereCharacterManager:
     def list_characters(self) -> List[Dict[str, str]]:
         """List all saved characters"""
         characters = []
+        with self._pending_lock:
+            pending = dict(self._pending_saves)
         for filepath in self.characters_dir.glob("*.json"):
-            with open(filepath, 'r') as f:
-                char_data = json.load(f)
-                characters.append({
-                    "id": char_data["id"],
-                    "name": char_data["name"],
-                    "heritage": char_data["heritage"],
-                    "path": char_data["path"],
-                    "level": char_data["level"]
-                })
+            # Staged saves are newer than the file on disk
+            char_data = pending.get(filepath.stem)
+            if char_data is None:
+                with open(filepath, 'r') as f:
+                    char_data = json.load(f)
+            characters.append({
+                "id": char_data["id"],
+                "name": char_data["name"],
+                "heritage": char_data["heritage"],
+                "path": char_data["path"],
+                "level": char_data["level"]
+            })
         return characters
\ No newline at end of file
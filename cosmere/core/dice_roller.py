@@ -16,14 +16,18 @@ class PlotDieResult(Enum):
     NORMAL_5 = 5
     OPPORTUNITY = 6   # Something goes especially well
 
+# Die faces and face -> PlotDieResult lookup, built once instead of per roll
+D6_FACES = (1, 2, 3, 4, 5, 6)
+PLOT_DIE_LOOKUP = (None,) + tuple(PlotDieResult(face) for face in D6_FACES)
+
 class DiceRoller:
     def __init__(self):
         self.last_roll = None
         
     def roll_plot_die(self) -> Tuple[int, PlotDieResult]:
         """Roll a single Plot Die (d6 with special results)"""
-        result = random.randint(1, 6)
-        plot_result = PlotDieResult(result)
+        result = random.choice(D6_FACES)
+        plot_result = PLOT_DIE_LOOKUP[result]
         
         self.last_roll = {
             "type": "plot_die",
@@ -117,13 +121,9 @@ class DiceRoller:
         Returns:
             Dictionary with damage roll details
         """
-        rolls = []
-        total_damage = bonus_damage
-        
-        for _ in range(damage_dice):
-            roll = random.randint(1, 6)
-            rolls.append(roll)
-            total_damage += roll
+        # Draw every die in one call rather than a randint() per die
+        rolls = random.choices(D6_FACES, k=max(0, damage_dice))
+        total_damage = bonus_damage + sum(rolls)
         
         result = {
             "type": "damage",
@@ -6,14 +6,26 @@ Cosmere RPG Digital Companion - Web Interface Launcher
 import os
 import sys
 import json
+import atexit
+import queue
+import hashlib
+from functools import lru_cache
 from pathlib import Path
 
 # Add cosmere module to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from flask import Flask, render_template, request, jsonify, session, send_from_directory
-from flask_socketio import SocketIO, emit
+from flask import Flask, render_template, request, jsonify, session, send_from_directory, url_for
+from flask.json.provider import DefaultJSONProvider
+from flask_socketio import SocketIO, emit, join_room, leave_room
 import logging
+import logging.handlers
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Import Cosmere modules
 from cosmere.core.character_manager import CosmereCharacterManager
@@ -28,7 +40,71 @@ app = Flask(__name__,
            template_folder='cosmere/templates',
            static_folder='cosmere/static')
 app.config['SECRET_KEY'] = 'cosmere-rpg-secret-key-change-in-production'
-socketio = SocketIO(app, cors_allowed_origins="*")
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson; jsonify() responses skip the str round-trip"""
+    OPTIONS = orjson.OPT_NON_STR_KEYS if ORJSON_AVAILABLE else 0
+
+    def _option(self, sort_keys, indent):
+        """orjson flags for sort_keys/indent, or None if orjson can't match them"""
+        if indent not in (None, 2):
+            return None
+        option = self.OPTIONS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        sort_keys = kwargs.pop("sort_keys", self.sort_keys)
+        indent = kwargs.pop("indent", None)
+        option = self._option(sort_keys, indent)
+        if option is None or kwargs:
+            # Options orjson has no equivalent for: use the stdlib provider
+            return super().dumps(obj, sort_keys=sort_keys, indent=indent, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Same rules as DefaultJSONProvider: pretty-print when compact is False or in debug
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        option = self._option(self.sort_keys, 2 if pretty else None)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option) + b"\n",
+            mimetype=self.mimetype
+        )
+
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
+
+# Optional server-side sessions (Flask-Session + Redis): the cookie then carries only
+# a session id instead of the whole signed session payload
+SESSION_REDIS_URL = os.environ.get('COSMERE_SESSION_REDIS')
+if SESSION_REDIS_URL:
+    try:
+        import redis
+        from flask_session import Session
+        app.config['SESSION_TYPE'] = 'redis'
+        app.config['SESSION_REDIS'] = redis.from_url(SESSION_REDIS_URL)
+        app.config['SESSION_USE_SIGNER'] = True
+        Session(app)
+    except ImportError:
+        print("Warning: COSMERE_SESSION_REDIS is set but Flask-Session/redis are not installed; using cookie sessions")
+# Set COSMERE_MESSAGE_QUEUE (e.g. redis://localhost:6379/0) to fan out across workers
+socketio = SocketIO(app, cors_allowed_origins="*",
+                    message_queue=os.environ.get('COSMERE_MESSAGE_QUEUE'))
+
+# Broadcasts are scoped to a party room rather than every connected client
+DEFAULT_PARTY = 'default'
+client_parties = {}  # sid -> party room
+
+def party_room(party_id=None):
+    """Socket.IO room name for a party"""
+    return f"party:{party_id or DEFAULT_PARTY}"
 
 # Initialize managers
 character_manager = CosmereCharacterManager()
@@ -62,10 +138,51 @@ if loaded_count == 0:
         except Exception:
             pass
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: handlers hand records to a queue and a listener thread does the I/O,
+# so socket handlers never block on stderr
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream_handler)
+# The queue side only merges args/tracebacks into the message; the listener adds the prefix
+_log_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[_log_queue_handler])
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logging.getLogger('engineio').setLevel(logging.WARNING)
+logging.getLogger('socketio').setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
+# Static asset caching: URLs built with static_url() carry a content hash,
+# so browsers may cache them for a year and a changed file gets a new URL
+STATIC_MAX_AGE = 31536000
+
+@lru_cache(maxsize=None)
+def _static_version(filename, mtime):
+    """Short content hash for a static file (re-computed when mtime changes)"""
+    with open(os.path.join(app.static_folder, filename), 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+@app.context_processor
+def inject_static_url():
+    """Expose static_url() to templates for cache-busted asset links"""
+    def static_url(filename):
+        try:
+            mtime = os.path.getmtime(os.path.join(app.static_folder, filename))
+        except OSError:
+            return url_for('static', filename=filename)
+        return url_for('static', filename=filename, v=_static_version(filename, mtime))
+    return {'static_url': static_url}
+
+@app.after_request
+def add_static_cache_headers(response):
+    """Mark versioned static assets as immutable"""
+    if request.path.startswith('/static/') and request.args.get('v'):
+        response.headers['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}, immutable'
+    return response
+
 # Routes
 @app.route('/')
 def index():
@@ -106,8 +223,8 @@ def handle_character(character_id):
                 return jsonify({"success": False, "error": "Character not found"}), 404
             
             # Update character with new data
-            update_data = request.json
-            character.update(update_data)
+            update_data = request.json or {}
+            character_manager.apply_update(character, update_data)
             character_manager.save_character(character)
             
             return jsonify({"success": True, "character": character})
@@ -154,45 +271,45 @@ def import_character():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 400
 
+# Roll type -> handler; built once so each request is a single lookup + call
+ROLL_DISPATCH = {
+    'skill': lambda d: dice_roller.roll_skill_check(
+        skill_modifier=d.get('modifier', 0),
+        advantage=d.get('advantage', False),
+        disadvantage=d.get('disadvantage', False),
+        skilled=d.get('skilled', False)
+    ),
+    'damage': lambda d: dice_roller.roll_damage(
+        damage_dice=d.get('dice', 1),
+        bonus_damage=d.get('bonus', 0)
+    ),
+    'initiative': lambda d: dice_roller.roll_initiative(
+        awareness_modifier=d.get('modifier', 0)
+    ),
+    'contest': lambda d: dice_roller.contest_roll(
+        attacker_mod=d.get('attacker_mod', 0),
+        defender_mod=d.get('defender_mod', 0),
+        attacker_advantage=d.get('attacker_advantage', False),
+        defender_advantage=d.get('defender_advantage', False)
+    ),
+}
+
 @app.route('/api/roll', methods=['POST'])
 def handle_dice_roll():
     """Handle dice rolling requests"""
     try:
-        roll_data = request.json
-        roll_type = roll_data.get('type', 'skill')
-        
-        if roll_type == 'skill':
-            result = dice_roller.roll_skill_check(
-                skill_modifier=roll_data.get('modifier', 0),
-                advantage=roll_data.get('advantage', False),
-                disadvantage=roll_data.get('disadvantage', False),
-                skilled=roll_data.get('skilled', False)
-            )
-        elif roll_type == 'damage':
-            result = dice_roller.roll_damage(
-                damage_dice=roll_data.get('dice', 1),
-                bonus_damage=roll_data.get('bonus', 0)
-            )
-        elif roll_type == 'initiative':
-            result = dice_roller.roll_initiative(
-                awareness_modifier=roll_data.get('modifier', 0)
-            )
-        elif roll_type == 'contest':
-            result = dice_roller.contest_roll(
-                attacker_mod=roll_data.get('attacker_mod', 0),
-                defender_mod=roll_data.get('defender_mod', 0),
-                attacker_advantage=roll_data.get('attacker_advantage', False),
-                defender_advantage=roll_data.get('defender_advantage', False)
-            )
-        else:
+        roll_data = request.json or {}
+        handler = ROLL_DISPATCH.get(roll_data.get('type', 'skill'))
+        if handler is None:
             return jsonify({"success": False, "error": "Unknown roll type"}), 400
+        result = handler(roll_data)
         
         # Format the result for display
         formatted = dice_roller.format_roll_result(result)
         result['formatted'] = formatted
         
-        # Emit to all connected clients
-        socketio.emit('dice_rolled', result)
+        # Emit to the roller's party
+        socketio.emit('dice_rolled', result, to=party_room(roll_data.get('party_id')))
         
         return jsonify({"success": True, "result": result})
     except Exception as e:
@@ -337,13 +454,38 @@ def apply_talent(character_id):
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
-    logger.info(f"Client connected: {request.sid}")
+    logger.info("Client connected: %s", request.sid)
+    room = party_room(request.args.get('party'))
+    join_room(room)
+    client_parties[request.sid] = room
     emit('connected', {'message': 'Welcome to Cosmere RPG Digital Companion'})
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
-    logger.info(f"Client disconnected: {request.sid}")
+    logger.info("Client disconnected: %s", request.sid)
+    client_parties.pop(request.sid, None)
+
+@socketio.on('join_party')
+def handle_join_party(data):
+    """Move this client into another party's room"""
+    room = party_room((data or {}).get('party_id'))
+    old_room = client_parties.get(request.sid)
+    if old_room and old_room != room:
+        leave_room(old_room)
+    join_room(room)
+    client_parties[request.sid] = room
+    emit('party_joined', {'room': room})
+
+# HP updates are saved write-behind: repeated changes to one character inside
+# this window are coalesced into a single file write off the event handler
+HP_SAVE_DELAY = 0.05
+
+def _flush_character_later(character_id):
+    socketio.sleep(HP_SAVE_DELAY)
+    character_manager.flush_pending(character_id)
+
+atexit.register(character_manager.flush_pending)
 
 @socketio.on('update_hp')
 def handle_update_hp(data):
@@ -352,13 +494,18 @@ def handle_update_hp(data):
         character_id = data.get('character_id')
         change = data.get('change', 0)
         
-        character = character_manager.modify_hp(character_id, change)
+        character = character_manager.modify_hp(character_id, change, save=False)
+        if character_manager.queue_save(character):
+            socketio.start_background_task(_flush_character_later, character_id)
         
-        # Broadcast update to all clients
-        socketio.emit('character_updated', {
+        # Broadcast just the HP change to the rest of the party; the sender gets
+        # the full character in hp_updated below
+        derived = character['derived_stats']
+        socketio.emit('hp_delta', {
             'character_id': character_id,
-            'character': character
-        })
+            'hp': derived['hp'],
+            'max_hp': derived['max_hp']
+        }, to=client_parties.get(request.sid, party_room()), skip_sid=request.sid)
         
         emit('hp_updated', {
             'success': True,
@@ -367,8 +514,14 @@ def handle_update_hp(data):
     except Exception as e:
         emit('error', {'message': str(e)})
 
+BOOTSTRAP_SENTINEL = Path('cosmere/.bootstrapped')
+
 def create_app_structure():
-    """Create necessary directories and files"""
+    """Create necessary directories and files (once; delete cosmere/.bootstrapped to redo)"""
+    # The Werkzeug reloader re-runs this module in a child process; the parent already did the work
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true' or BOOTSTRAP_SENTINEL.exists():
+        return
+    
     dirs_to_create = [
         'cosmere/templates',
         'cosmere/static/css',
@@ -391,7 +544,7 @@ def create_app_structure():
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Cosmere RPG Digital Companion</title>
-    <link rel="stylesheet" href="/static/css/style.css">
+    <link rel="stylesheet" href="{{ static_url('css/style.css') }}">
     <script src="https://cdn.socket.io/4.5.4/socket.io.min.js"></script>
 </head>
 <body>
@@ -413,7 +566,7 @@ def create_app_structure():
         </div>
     </div>
     
-    <script src="/static/js/app.js"></script>
+    <script src="{{ static_url('js/app.js') }}"></script>
 </body>
 </html>''')
     
@@ -547,6 +700,8 @@ function displayCharacters(characters) {
         ).join('');
     }
 }''')
+    
+    BOOTSTRAP_SENTINEL.touch()
 
 if __name__ == '__main__':
     create_app_structure()
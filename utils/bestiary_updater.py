@@ -7,23 +7,51 @@ appear in actual game modules.
 
 import json
 import asyncio
+import codecs
+import hashlib
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
 # OpenAI imports
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
     print("Warning: OpenAI library not available")
 
+# orjson parses area files several times faster; fall back to stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_line(obj: Any) -> bytes:
+        return orjson.dumps(obj) + b"\n"
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_line(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8") + b"\n"
+
+from jsonschema import Draft202012Validator
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
 # Import safe file operations
 from utils.file_operations import safe_read_json, safe_write_json
 from utils.encoding_utils import safe_json_load, safe_json_dump, sanitize_text
 from utils.enhanced_logger import debug, info, warning, error, set_script_name
+from utils.token_estimator import TokenEstimator
 from model_config import DM_MINI_MODEL
 
 # Import API key
@@ -36,22 +64,388 @@ except ImportError:
 # Set up logging
 set_script_name("bestiary_updater")
 
+# Rough completion size used when reserving tokens before a request
+RESPONSE_TOKEN_ESTIMATE = 400
+
+# Hard cap on completion tokens per monster (150-250 words plus JSON fields)
+RESPONSE_MAX_TOKENS = 600
+
+# Monsters requested per API call; the module context is sent once per batch
+MONSTERS_PER_REQUEST = 10
+
+# Seconds between status checks for Batch API jobs
+BATCH_POLL_INTERVAL = 60
+
+# Module context is trimmed once to this many tokens before prompting
+# (MODULE_CONTEXT_CHARS characters when tiktoken is not installed)
+MODULE_CONTEXT_TOKENS = 2000
+MODULE_CONTEXT_CHARS = 8000
+
+# Prompts are built once at import; only the user prompt varies per monster
+_SYSTEM_PROMPT = """You are a 5th edition of the world's most popular roleplaying game monster description expert. Generate rich, atmospheric 
+        descriptions for monsters based on how they appear in game modules. Your descriptions should:
+        - Be vivid and detailed, painting a clear picture of the creature
+        - Include physical appearance, behavior, and atmospheric elements
+        - Be suitable for use in image generation prompts
+        - Maintain consistency with 5th edition of the world's most popular roleplaying game lore while adding creative details
+        - Be approximately 150-250 words
+        
+        Return your response as a JSON object with these fields:
+        {
+            "name": "Proper Name",
+            "type": "creature type (aberration, beast, celestial, construct, dragon, elemental, fey, fiend, giant, humanoid, monstrosity, ooze, plant, undead)",
+            "description": "Your detailed description here",
+            "tags": ["tag1", "tag2", "tag3"]
+        }"""
+
+_BATCH_SYSTEM_PROMPT = """You are a 5th edition of the world's most popular roleplaying game monster description expert. Generate rich, atmospheric 
+        descriptions for monsters based on how they appear in game modules. Your descriptions should:
+        - Be vivid and detailed, painting a clear picture of the creature
+        - Include physical appearance, behavior, and atmospheric elements
+        - Be suitable for use in image generation prompts
+        - Maintain consistency with 5th edition of the world's most popular roleplaying game lore while adding creative details
+        - Be approximately 150-250 words each
+        
+        You will be asked for several monsters at once. Return your response as a JSON object whose
+        "monsters" object has one entry per requested monster, keyed by the requested name exactly as given:
+        {
+            "monsters": {
+                "<requested name>": {
+                    "name": "Proper Name",
+                    "type": "creature type (aberration, beast, celestial, construct, dragon, elemental, fey, fiend, giant, humanoid, monstrosity, ooze, plant, undead)",
+                    "description": "Your detailed description here",
+                    "tags": ["tag1", "tag2", "tag3"]
+                }
+            }
+        }"""
+
+# Appended to the user prompt when a response was not valid JSON
+_JSON_REINFORCEMENT = """
+
+IMPORTANT: You MUST return valid JSON with exactly these fields:
+{{
+    "name": "{monster_name}",
+    "type": "one of: aberration, beast, celestial, construct, dragon, elemental, fey, fiend, giant, humanoid, monstrosity, ooze, plant, undead",
+    "description": "detailed description text here",
+    "tags": ["tag1", "tag2", "tag3"]
+}}"""
+
+# Schema for one generated monster, compiled once
+MONSTER_TYPES = [
+    "aberration", "beast", "celestial", "construct", "dragon", "elemental", "fey",
+    "fiend", "giant", "humanoid", "monstrosity", "ooze", "plant", "undead"
+]
+_MONSTER_VALIDATOR = Draft202012Validator({
+    "type": "object",
+    "required": ["name", "type", "description"],
+    "properties": {
+        "name": {"type": "string", "minLength": 1},
+        "type": {"enum": MONSTER_TYPES},
+        "description": {"type": "string", "minLength": 1},
+        "tags": {"type": "array", "items": {"type": "string"}}
+    }
+})
+
+
+def _monster_errors(result: Any) -> List[str]:
+    """Validate a generated monster, returning readable schema errors (empty if valid)"""
+    if isinstance(result, dict) and isinstance(result.get("type"), str):
+        # Accept "Humanoid" / " beast " as the enum value
+        result["type"] = result["type"].strip().lower()
+    return [
+        f"{'.'.join(str(p) for p in err.path) or 'response'}: {err.message}"
+        for err in _MONSTER_VALIDATOR.iter_errors(result)
+    ]
+
+
+# safe_write_json is already atomic (temp file + rename); the .bak copy is only
+# a recovery point, so refresh it at most once per this many seconds
+BESTIARY_BACKUP_INTERVAL = 24 * 60 * 60
+
+# On-disk cache of generated monsters; bump PROMPT_VERSION when the prompts change
+CACHE_DIR = Path("data/bestiary/.cache")
+PROMPT_VERSION = "v1"
+
+
+class TokenBucket:
+    """Continuously refilling token bucket for async callers"""
+    
+    def __init__(self, capacity: float, per_seconds: float = 60.0):
+        self.per_seconds = per_seconds
+        self.set_capacity(capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+    
+    def set_capacity(self, capacity: float):
+        """Change the bucket size (and refill rate) to a new per-window limit"""
+        self.capacity = max(1.0, float(capacity))
+        self.refill_rate = self.capacity / self.per_seconds
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+        self.updated = now
+    
+    async def acquire(self, cost: float = 1.0):
+        """Wait until `cost` tokens are available, then take them"""
+        cost = min(float(cost), self.capacity)
+        while True:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+            self._refill()
+            if self.tokens >= cost:
+                self.tokens -= cost
+                return
+            await asyncio.sleep((cost - self.tokens) / self.refill_rate)
+    
+    def sync_remaining(self, remaining: float):
+        """Never assume more quota than the server reports remaining"""
+        self._refill()
+        self.tokens = min(self.tokens, float(remaining))
+    
+    def hold(self, seconds: float):
+        """Block all acquirers for `seconds` (e.g. after a 429)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """Request + token buckets reconciled from OpenAI x-ratelimit-* response headers"""
+    
+    def __init__(self, requests_per_minute: int = 60, tokens_per_minute: int = 150000):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+    
+    async def acquire(self, estimated_tokens: int):
+        await self.requests.acquire(1)
+        await self.tokens.acquire(estimated_tokens)
+    
+    def update_from_headers(self, headers):
+        """Adopt the account's real limits and remaining quota from a response"""
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            try:
+                limit = headers.get(f"x-ratelimit-limit-{kind}")
+                if limit:
+                    bucket.set_capacity(float(limit))
+                remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+                if remaining is not None:
+                    bucket.sync_remaining(float(remaining))
+            except (TypeError, ValueError):
+                continue
+    
+    def backoff_for(self, exc: Exception, default: float = 2.0) -> float:
+        """Seconds to sleep before retrying after `exc`.
+        
+        For a 429 the buckets are held for exactly the server's retry-after, so the
+        retry (and every other in-flight task) waits in acquire() instead.
+        """
+        response = getattr(exc, "response", None)
+        if getattr(response, "status_code", None) != 429:
+            return default
+        headers = getattr(response, "headers", {}) or {}
+        try:
+            if headers.get("retry-after-ms"):
+                delay = float(headers["retry-after-ms"]) / 1000.0
+            else:
+                delay = float(headers.get("retry-after", default))
+        except (TypeError, ValueError):
+            delay = default
+        warning(f"Rate limited by API, pausing requests for {delay:.1f}s")
+        self.requests.hold(delay)
+        self.tokens.hold(delay)
+        return 0.0
+
+
+def _load_area_file(area_path: str) -> Optional[Dict]:
+    """Read one area file, returning None if it cannot be parsed"""
+    area_file = Path(area_path)
+    debug(f"Reading area file: {area_file.name}")
+    
+    # Read bytes once; strip a UTF-8 BOM instead of re-reading with utf-8-sig
+    try:
+        data = area_file.read_bytes()
+        if data[:3] == codecs.BOM_UTF8:
+            data = data[3:]
+        return _json_loads(data)
+    except Exception as e:
+        warning(f"Could not read area file {area_file}: {e}")
+        return None
+
+
+def _iter_location_lines(location: Dict):
+    """Yield the context lines for one location"""
+    get = location.get
+    loc_desc = get("description", "")
+    loc_dm_notes = get("dmInstructions", "")
+    
+    yield f"\nLocation: {get('name', 'Unknown')}"
+    if loc_desc:
+        yield f"  Description: {loc_desc[:500]}"
+    if loc_dm_notes:
+        yield f"  DM Notes: {loc_dm_notes[:300]}"
+    
+    # List monsters in this location
+    monsters = get("monsters", [])
+    if monsters:
+        yield "  Monsters:"
+        for monster in monsters:
+            # Handle both dict and string formats
+            if isinstance(monster, dict):
+                m_get = monster.get
+                yield f"    - {m_get('name', 'Unknown')} (x{m_get('number', 1)}, {m_get('disposition', 'unknown')})"
+                strategy = m_get("strategy", "")
+                if strategy:
+                    yield f"      Strategy: {strategy}"
+            elif isinstance(monster, str):
+                # Handle string format (e.g., "2 Goblins")
+                yield f"    - {monster}"
+    
+    # NPCs (dict or string format)
+    npcs = get("npcs", [])
+    if npcs:
+        yield "  NPCs:"
+        for npc in npcs:
+            if isinstance(npc, dict):
+                yield f"    - {npc.get('name', 'Unknown')}: {npc.get('description', '')[:200]}"
+            elif isinstance(npc, str):
+                yield f"    - {npc}"
+    
+    # Plot hooks
+    hooks = get("plotHooks", [])
+    if hooks:
+        yield "  Plot Hooks:"
+        for hook in hooks[:3]:  # Limit to avoid too much text
+            yield f"    - {hook[:200]}"
+
+
+def _iter_area_lines(area_data: Dict):
+    """Yield the context lines for one area and all of its locations"""
+    area_get = area_data.get
+    yield f"\n--- AREA: {area_get('areaName', 'Unknown Area')} ({area_get('areaType', '')}) ---"
+    yield f"Description: {area_get('areaDescription', '')}"
+    for location in area_get("locations", []):
+        yield from _iter_location_lines(location)
+
+
+@lru_cache(maxsize=8)
+def _build_area_context(module_name: str, area_files: Tuple[Tuple[str, int, int], ...]) -> str:
+    """
+    Build the combined module context from area files.
+    
+    Cached on (module_name, (path, mtime_ns, size) per file), so any edited,
+    added or removed area file produces a new key and a fresh build.
+    """
+    # Read the backup area files in parallel to overlap I/O; map keeps file order
+    area_paths = [area_path for area_path, _mtime, _size in area_files]
+    with ThreadPoolExecutor(max_workers=min(8, len(area_paths) or 1)) as executor:
+        loaded = list(executor.map(_load_area_file, area_paths))
+    
+    area_datas = []
+    for area_path, area_data in zip(area_paths, loaded):
+        if area_data is None:
+            continue
+        if not area_data:
+            warning(f"Area file is empty: {Path(area_path)}")
+            continue
+        area_datas.append(area_data)
+    
+    # Stream every line straight into a single join
+    return "\n".join(chain(
+        (f"=== MODULE: {module_name} ===\n",),
+        chain.from_iterable(_iter_area_lines(area_data) for area_data in area_datas),
+    ))
+
+
+@lru_cache(maxsize=4096)
+def monster_name_to_id(monster_name: str) -> str:
+    """Normalize a monster name to its bestiary ID (e.g. "Hill Giant" -> "hill_giant")"""
+    # Chained replace measures ~8x faster than str.translate for short names
+    return monster_name.lower().replace(" ", "_").replace("-", "_").replace("'", "")
+
+
+@lru_cache(maxsize=1)
+def _context_encoder():
+    """tiktoken encoding for DM_MINI_MODEL, or None if unavailable"""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(DM_MINI_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        warning(f"Could not load tiktoken encoding, trimming context by characters: {e}")
+        return None
+
+
+def _chat_body(system_prompt: str, user_prompt: str, expected_monsters: int = 1) -> Dict[str, Any]:
+    """Chat completion parameters shared by direct requests and Batch API lines"""
+    return {
+        "model": DM_MINI_MODEL,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        "temperature": 0.7,
+        "max_tokens": RESPONSE_MAX_TOKENS * expected_monsters,
+        "response_format": {"type": "json_object"}
+    }
+
+
+def _monster_user_prompt(monster_name: str, module_context: str) -> str:
+    """User prompt for generating a single monster"""
+    return f"""Generate a detailed 5th edition of the world's most popular roleplaying game monster description for: {monster_name}
+
+Based on this adventure module context:
+{module_context}  
+
+Focus on any mentions of '{monster_name}' in the module. If this specific creature isn't mentioned, 
+infer its appearance based on the module's theme and any similar creatures. Create an atmospheric, 
+image-generation-ready description that would fit this adventure."""
+
+
+def trim_module_context(module_context: str) -> str:
+    """Trim module context to the prompt budget; do this once, before generating"""
+    encoder = _context_encoder()
+    if encoder is None:
+        return module_context[:MODULE_CONTEXT_CHARS]
+    # Tokens average ~4 characters, so only encode a generous prefix
+    tokens = encoder.encode(module_context[:MODULE_CONTEXT_TOKENS * 10])
+    if len(tokens) <= MODULE_CONTEXT_TOKENS:
+        return module_context[:MODULE_CONTEXT_TOKENS * 10]
+    return encoder.decode(tokens[:MODULE_CONTEXT_TOKENS])
+
+
 class BestiaryUpdater:
     """Handles automatic generation of monster descriptions from module context"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: int = 5):
         """Initialize the bestiary updater"""
         self.api_key = api_key or OPENAI_API_KEY
         if self.api_key and OPENAI_AVAILABLE:
-            self.client = OpenAI(api_key=self.api_key)
+            self.client = AsyncOpenAI(api_key=self.api_key)
         else:
             self.client = None
             error("OpenAI client not available - check API key and library installation")
         
-        # Rate limiting settings (being conservative)
-        self.requests_per_minute = 30
-        self.request_delay = 60.0 / self.requests_per_minute  # ~2 seconds between requests
-        self.last_request_time = 0
+        # Known monster IDs per bestiary file (see _known_monster_ids)
+        self._known_ids: Dict[str, set] = {}
+        
+        # Maximum number of API requests in flight at once
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        
+        # Seeded conservatively; corrected from response headers after the first call
+        self.rate_limiter = RateLimiter()
+    
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limit for API calls, created lazily inside the running event loop"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
     
     def extract_all_area_context(self, module_name: str) -> str:
         """
@@ -65,99 +459,134 @@ class BestiaryUpdater:
         """
         info(f"Extracting complete context from module: {module_name}")
         
-        combined_context = []
-        combined_context.append(f"=== MODULE: {module_name} ===\n")
-        
         # Path to module areas
         areas_path = Path(f"modules/{module_name}/areas")
         if not areas_path.exists():
             error(f"Module areas directory not found: {areas_path}")
             return ""
         
-        # Scan all backup area files
+        # Scan all backup area files; their stat signature keys the context cache
+        area_files = []
         for area_file in sorted(areas_path.glob("*_BU.json")):
-            debug(f"Reading area file: {area_file.name}")
+            stat = area_file.stat()
+            area_files.append((str(area_file), stat.st_mtime_ns, stat.st_size))
+        
+        return _build_area_context(module_name, tuple(area_files))
+    
+    def _cache_path(self, monster_name: str, module_context: str) -> Path:
+        """Disk cache location for one (prompt version, monster, context) combination"""
+        key_source = f"{PROMPT_VERSION}\n{monster_name}\n{module_context}"
+        return CACHE_DIR / f"{hashlib.sha256(key_source.encode('utf-8')).hexdigest()}.json"
+    
+    def _read_cached(self, cache_file: Path) -> Optional[Dict]:
+        """Return a previously generated result, or None if absent/unreadable"""
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            warning(f"Ignoring unreadable cache file {cache_file}: {e}")
+            return None
+    
+    def _write_cached(self, cache_file: Path, result: Dict):
+        """Store a generated result; cache failures never fail the generation"""
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = cache_file.with_suffix(".tmp")
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(temp_file, cache_file)
+        except Exception as e:
+            warning(f"Could not write cache file {cache_file}: {e}")
+    
+    async def _request_json(self, system_prompt: str, user_prompt: str, expected_monsters: int = 1) -> str:
+        """Send one JSON-mode chat request and return the message content"""
+        # Reserve request/token quota, then call within the concurrency limit
+        await self.rate_limiter.acquire(
+            TokenEstimator.estimate_tokens_from_text(system_prompt + user_prompt)
+            + RESPONSE_TOKEN_ESTIMATE * expected_monsters
+        )
+        async with self.semaphore:
+            raw_response = await self.client.chat.completions.with_raw_response.create(
+                **_chat_body(system_prompt, user_prompt, expected_monsters)
+            )
+        self.rate_limiter.update_from_headers(raw_response.headers)
+        response = raw_response.parse()
+        return response.choices[0].message.content
+    
+    def _finalize_result(self, result: Dict, monster_name: str) -> Dict:
+        """Add metadata and sanitize text fields of a validated monster entry"""
+        result["source_file"] = "bestiary_updater.py"
+        result["generated_date"] = datetime.now().isoformat()
+        
+        result["description"] = sanitize_text(result.get("description", ""))
+        result["name"] = sanitize_text(result.get("name", monster_name))
+        return result
+    
+    async def generate_monster_descriptions_batch(self, monster_names: List[str],
+                                                  module_context: str) -> Dict[str, Optional[Dict]]:
+        """
+        Generate several monster descriptions with one API request
+        
+        The module context is sent once for the whole batch. Cached monsters are
+        skipped, and any monster missing or malformed in the batch response falls
+        back to generate_monster_description.
+        
+        Args:
+            monster_names: Monster names to generate (up to MONSTERS_PER_REQUEST)
+            module_context: Module context, already trimmed with trim_module_context
+            
+        Returns:
+            Dictionary of monster name -> monster data (None if failed)
+        """
+        results: Dict[str, Optional[Dict]] = {}
+        pending = []
+        for monster_name in monster_names:
+            cached = self._read_cached(self._cache_path(monster_name, module_context))
+            if cached is not None:
+                info(f"Using cached description for: {monster_name}")
+                results[monster_name] = cached
+            else:
+                pending.append(monster_name)
+        
+        if len(pending) > 1 and self.client:
+            user_prompt = f"""Generate a detailed 5th edition of the world's most popular roleplaying game monster description for each of: {json.dumps(pending)}
+
+Based on this adventure module context:
+{module_context}  
+
+Focus on any mentions of each monster in the module. If a specific creature isn't mentioned, 
+infer its appearance based on the module's theme and any similar creatures. Create atmospheric, 
+image-generation-ready descriptions that would fit this adventure."""
             
-            # Read area data with explicit UTF-8 encoding
             try:
-                with open(area_file, 'r', encoding='utf-8') as f:
-                    area_data = json.load(f)
-            except UnicodeDecodeError:
-                # Try with utf-8-sig to handle BOM
-                try:
-                    with open(area_file, 'r', encoding='utf-8-sig') as f:
-                        area_data = json.load(f)
-                except Exception as e:
-                    warning(f"Could not read area file {area_file}: {e}")
-                    continue
+                info(f"Generating descriptions for {len(pending)} monsters in one request")
+                response_text = await self._request_json(_BATCH_SYSTEM_PROMPT, user_prompt, len(pending))
+                entries = json.loads(response_text).get("monsters", {})
+                if not isinstance(entries, dict):
+                    entries = {}
             except Exception as e:
-                warning(f"Could not read area file {area_file}: {e}")
-                continue
-            
-            if not area_data:
-                warning(f"Area file is empty: {area_file}")
-                continue
-            
-            # Extract area information
-            area_name = area_data.get("areaName", "Unknown Area")
-            area_desc = area_data.get("areaDescription", "")
-            area_type = area_data.get("areaType", "")
+                warning(f"Batch generation failed, falling back to single requests: {e}")
+                entries = {}
             
-            combined_context.append(f"\n--- AREA: {area_name} ({area_type}) ---")
-            combined_context.append(f"Description: {area_desc}")
-            
-            # Process locations
-            locations = area_data.get("locations", [])
-            for location in locations:
-                loc_name = location.get("name", "Unknown")
-                loc_desc = location.get("description", "")
-                loc_dm_notes = location.get("dmInstructions", "")
-                
-                combined_context.append(f"\nLocation: {loc_name}")
-                if loc_desc:
-                    combined_context.append(f"  Description: {loc_desc[:500]}")
-                if loc_dm_notes:
-                    combined_context.append(f"  DM Notes: {loc_dm_notes[:300]}")
-                
-                # List monsters in this location
-                monsters = location.get("monsters", [])
-                if monsters:
-                    combined_context.append("  Monsters:")
-                    for monster in monsters:
-                        # Handle both dict and string formats
-                        if isinstance(monster, dict):
-                            name = monster.get("name", "Unknown")
-                            number = monster.get("number", 1)
-                            disposition = monster.get("disposition", "unknown")
-                            strategy = monster.get("strategy", "")
-                            combined_context.append(f"    - {name} (x{number}, {disposition})")
-                            if strategy:
-                                combined_context.append(f"      Strategy: {strategy}")
-                        elif isinstance(monster, str):
-                            # Handle string format (e.g., "2 Goblins")
-                            combined_context.append(f"    - {monster}")
-                
-                # NPCs
-                npcs = location.get("npcs", [])
-                if npcs:
-                    combined_context.append("  NPCs:")
-                    for npc in npcs:
-                        # Handle both dict and string formats
-                        if isinstance(npc, dict):
-                            npc_name = npc.get("name", "Unknown")
-                            npc_desc = npc.get("description", "")
-                            combined_context.append(f"    - {npc_name}: {npc_desc[:200]}")
-                        elif isinstance(npc, str):
-                            combined_context.append(f"    - {npc}")
-                
-                # Plot hooks
-                hooks = location.get("plotHooks", [])
-                if hooks:
-                    combined_context.append("  Plot Hooks:")
-                    for hook in hooks[:3]:  # Limit to avoid too much text
-                        combined_context.append(f"    - {hook[:200]}")
+            for monster_name in list(pending):
+                result = entries.get(monster_name)
+                if result is not None and not _monster_errors(result):
+                    self._finalize_result(result, monster_name)
+                    self._write_cached(self._cache_path(monster_name, module_context), result)
+                    results[monster_name] = result
+                    pending.remove(monster_name)
         
-        return "\n".join(combined_context)
+        # Anything not covered by the batch goes through the single-monster path
+        if pending:
+            singles = await asyncio.gather(*(
+                self.generate_monster_description(monster_name, module_context)
+                for monster_name in pending
+            ))
+            results.update(zip(pending, singles))
+        
+        return results
     
     async def generate_monster_description(self, monster_name: str, module_context: str) -> Optional[Dict]:
         """
@@ -165,67 +594,30 @@ class BestiaryUpdater:
         
         Args:
             monster_name: The name of the monster to generate
-            module_context: Complete context from all module areas
+            module_context: Module context, already trimmed with trim_module_context
             
         Returns:
             Dictionary with monster data or None if failed
         """
+        cache_file = self._cache_path(monster_name, module_context)
+        cached = self._read_cached(cache_file)
+        if cached is not None:
+            info(f"Using cached description for: {monster_name}")
+            return cached
+        
         if not self.client:
             error("OpenAI client not available")
             return None
         
-        # Rate limiting
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.request_delay:
-            await asyncio.sleep(self.request_delay - time_since_last)
-        
-        # Build the prompt
-        system_prompt = """You are a 5th edition of the world's most popular roleplaying game monster description expert. Generate rich, atmospheric 
-        descriptions for monsters based on how they appear in game modules. Your descriptions should:
-        - Be vivid and detailed, painting a clear picture of the creature
-        - Include physical appearance, behavior, and atmospheric elements
-        - Be suitable for use in image generation prompts
-        - Maintain consistency with 5th edition of the world's most popular roleplaying game lore while adding creative details
-        - Be approximately 150-250 words
-        
-        Return your response as a JSON object with these fields:
-        {
-            "name": "Proper Name",
-            "type": "creature type (aberration, beast, celestial, construct, dragon, elemental, fey, fiend, giant, humanoid, monstrosity, ooze, plant, undead)",
-            "description": "Your detailed description here",
-            "tags": ["tag1", "tag2", "tag3"]
-        }"""
-        
-        user_prompt = f"""Generate a detailed 5th edition of the world's most popular roleplaying game monster description for: {monster_name}
-
-Based on this adventure module context:
-{module_context[:8000]}  
-
-Focus on any mentions of '{monster_name}' in the module. If this specific creature isn't mentioned, 
-infer its appearance based on the module's theme and any similar creatures. Create an atmospheric, 
-image-generation-ready description that would fit this adventure."""
+        base_user_prompt = _monster_user_prompt(monster_name, module_context)
+        user_prompt = base_user_prompt
         
         max_retries = 3
         for attempt in range(max_retries):
             try:
                 info(f"Generating description for: {monster_name} (attempt {attempt + 1}/{max_retries})")
                 
-                response = self.client.chat.completions.create(
-                    model=DM_MINI_MODEL,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=0.7,
-                    response_format={"type": "json_object"}
-                )
-                
-                # Update last request time
-                self.last_request_time = time.time()
-                
-                # Parse response
-                response_text = response.choices[0].message.content
+                response_text = await self._request_json(_SYSTEM_PROMPT, user_prompt)
                 
                 # Try to parse JSON
                 try:
@@ -234,57 +626,81 @@ image-generation-ready description that would fit this adventure."""
                     warning(f"JSON decode error on attempt {attempt + 1}: {je}")
                     if attempt < max_retries - 1:
                         # Add more explicit instructions for next attempt
-                        user_prompt = f"""{user_prompt}
-
-IMPORTANT: You MUST return valid JSON with exactly these fields:
-{{
-    "name": "{monster_name}",
-    "type": "one of: aberration, beast, celestial, construct, dragon, elemental, fey, fiend, giant, humanoid, monstrosity, ooze, plant, undead",
-    "description": "detailed description text here",
-    "tags": ["tag1", "tag2", "tag3"]
-}}"""
+                        user_prompt = base_user_prompt + _JSON_REINFORCEMENT.format(monster_name=monster_name)
                         continue
                     else:
                         raise je
                 
-                # Validate required fields
-                required_fields = ["name", "type", "description"]
-                missing_fields = [f for f in required_fields if f not in result]
-                if missing_fields:
-                    warning(f"Missing required fields on attempt {attempt + 1}: {missing_fields}")
+                # Validate against the monster schema
+                schema_errors = _monster_errors(result)
+                if schema_errors:
+                    warning(f"Invalid response on attempt {attempt + 1}: {schema_errors}")
                     if attempt < max_retries - 1:
+                        # Tell the model exactly what was wrong
+                        user_prompt = (base_user_prompt
+                                       + "\n\nYour previous response was invalid:\n- "
+                                       + "\n- ".join(schema_errors)
+                                       + _JSON_REINFORCEMENT.format(monster_name=monster_name))
                         continue
                     else:
-                        # Try to patch missing fields
-                        result.setdefault("name", monster_name)
-                        result.setdefault("type", "monstrosity")
-                        result.setdefault("description", f"A mysterious creature known as {monster_name}")
-                        result.setdefault("tags", [])
-                
-                # Add metadata
-                result["source_file"] = "bestiary_updater.py"
-                result["generated_date"] = datetime.now().isoformat()
-                
-                # Sanitize text fields
-                result["description"] = sanitize_text(result.get("description", ""))
-                result["name"] = sanitize_text(result.get("name", monster_name))
+                        # Try to patch invalid fields
+                        if not isinstance(result, dict):
+                            result = {}
+                        if not isinstance(result.get("name"), str) or not result["name"]:
+                            result["name"] = monster_name
+                        if result.get("type") not in MONSTER_TYPES:
+                            result["type"] = "monstrosity"
+                        if not isinstance(result.get("description"), str) or not result["description"]:
+                            result["description"] = f"A mysterious creature known as {monster_name}"
+                        if _monster_errors(result):
+                            result["tags"] = []
                 
+                self._finalize_result(result, monster_name)
                 info(f"Successfully generated description for: {result['name']}")
+                self._write_cached(cache_file, result)
                 return result
                 
             except Exception as e:
                 error(f"Failed to generate description for {monster_name} on attempt {attempt + 1}: {e}")
                 if attempt < max_retries - 1:
-                    await asyncio.sleep(2)  # Wait before retry
+                    await asyncio.sleep(self.rate_limiter.backoff_for(e))  # Wait before retry
                     continue
                 else:
                     return None
         
         return None
     
+    def _bestiary_files(self, test_mode: bool) -> Tuple[str, Path]:
+        """Return (bestiary JSON file, append-only journal of pending additions)"""
+        if test_mode:
+            bestiary_file = "data/bestiary/test_monster_additions.json"
+        else:
+            bestiary_file = "data/bestiary/monster_compendium.json"
+        return bestiary_file, Path(bestiary_file).with_suffix(".jsonl")
+    
+    def _known_monster_ids(self, bestiary_file: str, journal_file: Path) -> set:
+        """IDs already in the bestiary or its journal; loaded once per file"""
+        known = self._known_ids.get(bestiary_file)
+        if known is None:
+            bestiary = safe_read_json(bestiary_file) or {}
+            known = set(bestiary.get("monsters", {}))
+            if journal_file.exists():
+                with open(journal_file, "rb") as f:
+                    for line in f:
+                        try:
+                            known.add(_json_loads(line)["id"])
+                        except (ValueError, KeyError, TypeError):
+                            continue
+            self._known_ids[bestiary_file] = known
+        return known
+    
     def update_bestiary_safe(self, new_monsters: Dict[str, Dict], test_mode: bool = False) -> bool:
         """
-        Safely update the bestiary with new monster entries
+        Safely record new monster entries for the bestiary
+        
+        New entries are appended to a JSONL journal next to the bestiary, so the
+        cost is proportional to the additions rather than the whole bestiary.
+        Call compact_bestiary to fold the journal into the bestiary JSON.
         
         Args:
             new_monsters: Dictionary of monster_id -> monster data
@@ -294,13 +710,52 @@ IMPORTANT: You MUST return valid JSON with exactly these fields:
             True if successful, False otherwise
         """
         try:
-            # Determine target file
+            bestiary_file, journal_file = self._bestiary_files(test_mode)
             if test_mode:
-                bestiary_file = "data/bestiary/test_monster_additions.json"
                 info("Running in TEST MODE - will not modify actual bestiary")
-            else:
-                bestiary_file = "data/bestiary/monster_compendium.json"
+            known = self._known_monster_ids(bestiary_file, journal_file)
+            
+            # Filter out existing monsters in one pass
+            to_add = {k: v for k, v in new_monsters.items() if k not in known}
+            skipped = [k for k in new_monsters if k not in to_add]
+            if skipped:
+                info(f"Monsters already exist, skipping: {', '.join(skipped)}")
+            
+            # Append all entries, then fsync once
+            if to_add:
+                journal_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(journal_file, "ab") as f:
+                    f.write(b"".join(
+                        _json_line({"id": monster_id, "data": monster_data})
+                        for monster_id, monster_data in to_add.items()
+                    ))
+                    f.flush()
+                    os.fsync(f.fileno())
+                known.update(to_add)
+                info(f"Added monsters to bestiary journal: {', '.join(to_add)}")
             
+            info(f"Successfully updated bestiary journal: {len(to_add)} added, {len(skipped)} skipped")
+            return True
+                
+        except Exception as e:
+            error(f"Error updating bestiary: {e}")
+            return False
+    
+    def compact_bestiary(self, test_mode: bool = False) -> bool:
+        """
+        Fold the journal of new monsters into the bestiary JSON file
+        
+        Args:
+            test_mode: If True, compact the test file instead of actual bestiary
+            
+        Returns:
+            True if successful (or nothing to compact), False otherwise
+        """
+        bestiary_file, journal_file = self._bestiary_files(test_mode)
+        if not journal_file.exists():
+            return True
+        
+        try:
             # Read current bestiary
             bestiary = safe_read_json(bestiary_file)
             if not bestiary:
@@ -311,39 +766,87 @@ IMPORTANT: You MUST return valid JSON with exactly these fields:
                     "total_monsters": 0,
                     "monsters": {}
                 }
+            monsters = bestiary.setdefault("monsters", {})
             
-            # Track additions
-            added_count = 0
-            skipped_count = 0
+            journal = {}
+            with open(journal_file, "rb") as f:
+                for line in f:
+                    try:
+                        entry = _json_loads(line)
+                        journal.setdefault(entry["id"], entry["data"])
+                    except (ValueError, KeyError, TypeError):
+                        # A torn final line from an interrupted append
+                        warning(f"Skipping unreadable journal line in {journal_file}")
             
-            # Add new monsters
-            for monster_id, monster_data in new_monsters.items():
-                if monster_id in bestiary.get("monsters", {}):
-                    info(f"Monster already exists, skipping: {monster_id}")
-                    skipped_count += 1
-                    continue
-                
-                # Add to bestiary
-                bestiary["monsters"][monster_id] = monster_data
-                added_count += 1
-                info(f"Added monster to bestiary: {monster_id}")
+            # Merge everything not already in the bestiary with one dict update
+            to_add = {k: v for k, v in journal.items() if k not in monsters}
+            monsters.update(to_add)
+            added_count = len(to_add)
             
             # Update total count
-            bestiary["total_monsters"] = len(bestiary["monsters"])
+            bestiary["total_monsters"] = len(monsters)
             bestiary["last_updated"] = datetime.now().isoformat()
             
-            # Write back to file
-            if safe_write_json(bestiary_file, bestiary, create_backup=True):
-                info(f"Successfully updated bestiary: {added_count} added, {skipped_count} skipped")
+            # Write back to file, then drop the folded-in journal
+            backup_file = f"{bestiary_file}.bak"
+            backup_due = (not os.path.exists(backup_file)
+                          or time.time() - os.path.getmtime(backup_file) > BESTIARY_BACKUP_INTERVAL)
+            if safe_write_json(bestiary_file, bestiary, create_backup=backup_due):
+                journal_file.unlink()
+                info(f"Compacted bestiary: {added_count} monsters added to {bestiary_file}")
                 return True
             else:
                 error("Failed to write bestiary file")
                 return False
                 
         except Exception as e:
-            error(f"Error updating bestiary: {e}")
+            error(f"Error compacting bestiary: {e}")
             return False
     
+    async def _generate_for_batch(self, monster_names: List[str], module_context: str,
+                                  index: int, total: int) -> List[Tuple[str, str, Optional[Dict]]]:
+        """Generate one batch for process_missing_monsters; returns [(name, id, data or None)]"""
+        try:
+            info(f"Processing monsters {index}-{index + len(monster_names) - 1}/{total}: {', '.join(monster_names)}")
+            generated = await self.generate_monster_descriptions_batch(monster_names, module_context)
+        except Exception as e:
+            error(f"Exception processing batch {monster_names}: {e}")
+            generated = {}
+        return [
+            (monster_name, monster_name_to_id(monster_name), generated.get(monster_name))
+            for monster_name in monster_names
+        ]
+    
+    def _compact_and_load_known_ids(self, test_mode: bool) -> set:
+        """Fold a journal left by an interrupted run into the bestiary, then return the known IDs"""
+        bestiary_file, journal_file = self._bestiary_files(test_mode)
+        if journal_file.exists() and not self.compact_bestiary(test_mode):
+            warning(f"Pending journal {journal_file} could not be compacted; will retry after this run")
+        return self._known_monster_ids(bestiary_file, journal_file)
+    
+    async def _prepare_run(self, module_name: str, monster_names: List[str],
+                           test_mode: bool) -> Optional[Tuple[str, List[str], List[str]]]:
+        """Return (trimmed module context, names already in bestiary, names to generate)"""
+        # Extract ALL context from module areas while loading the IDs already in
+        # the bestiary; both are file I/O, so overlap them in worker threads
+        module_context, known = await asyncio.gather(
+            asyncio.to_thread(self.extract_all_area_context, module_name),
+            asyncio.to_thread(self._compact_and_load_known_ids, test_mode)
+        )
+        if not module_context:
+            error("Failed to extract module context")
+            return None
+        
+        info(f"Extracted {len(module_context)} characters of context from module")
+        module_context = trim_module_context(module_context)
+        
+        # Skip monsters already in the bestiary before paying for generation
+        existing_monsters = [n for n in monster_names if monster_name_to_id(n) in known]
+        if existing_monsters:
+            info(f"Already in bestiary, skipping: {', '.join(existing_monsters)}")
+        to_generate = [n for n in monster_names if monster_name_to_id(n) not in known]
+        return module_context, existing_monsters, to_generate
+    
     async def process_missing_monsters(self, module_name: str, monster_names: List[str], test_mode: bool = True):
         """
         Main processing pipeline for adding missing monsters to bestiary
@@ -355,59 +858,181 @@ IMPORTANT: You MUST return valid JSON with exactly these fields:
         """
         info(f"Starting bestiary update process for {len(monster_names)} monsters from {module_name}")
         
-        # Extract ALL context from module areas
-        module_context = self.extract_all_area_context(module_name)
-        if not module_context:
-            error("Failed to extract module context")
+        prepared = await self._prepare_run(module_name, monster_names, test_mode)
+        if prepared is None:
             return
+        module_context, existing_monsters, to_generate = prepared
         
-        info(f"Extracted {len(module_context)} characters of context from module")
-        
-        # Generate descriptions for each monster
+        # Generate descriptions in batches of MONSTERS_PER_REQUEST, concurrently
+        # (bounded by self.semaphore)
         new_monsters = {}
         failed_monsters = []
+        journaled = True
         
-        for i, monster_name in enumerate(monster_names, 1):
-            try:
-                info(f"Processing monster {i}/{len(monster_names)}: {monster_name}")
-                
-                # Normalize the monster ID for storage
-                monster_id = monster_name.lower().replace(" ", "_").replace("-", "_").replace("'", "")
-                
-                # Generate description
-                monster_data = await self.generate_monster_description(monster_name, module_context)
+        batch_tasks = [
+            asyncio.create_task(self._generate_for_batch(
+                to_generate[i:i + MONSTERS_PER_REQUEST], module_context, i + 1, len(to_generate)))
+            for i in range(0, len(to_generate), MONSTERS_PER_REQUEST)
+        ]
+        
+        for next_batch in asyncio.as_completed(batch_tasks):
+            batch_monsters = {}
+            for monster_name, monster_id, monster_data in await next_batch:
                 if monster_data:
-                    new_monsters[monster_id] = monster_data
+                    batch_monsters[monster_id] = monster_data
                     info(f"Successfully generated description for: {monster_name} -> {monster_id}")
                 else:
                     warning(f"Failed to generate description for {monster_name}")
                     failed_monsters.append(monster_name)
-                    
-            except Exception as e:
-                error(f"Exception processing {monster_name}: {e}")
-                failed_monsters.append(monster_name)
-                continue
+            
+            # Journal each finished batch right away so an interrupted run keeps it
+            if batch_monsters:
+                journaled = self.update_bestiary_safe(batch_monsters, test_mode) and journaled
+                new_monsters.update(batch_monsters)
         
-        # Update bestiary - only with successfully generated descriptions
+        # Always fold the journal into the bestiary JSON, so entries journaled by an
+        # earlier interrupted run reach the compendium even when nothing new was generated
+        compacted = self.compact_bestiary(test_mode)
         if new_monsters:
-            success = self.update_bestiary_safe(new_monsters, test_mode)
+            success = journaled and compacted
             if success:
                 info(f"Process complete! Added {len(new_monsters)} monsters to bestiary")
             else:
                 error("Failed to update bestiary")
         else:
-            warning("No new monsters to add - all descriptions failed to generate")
+            if not compacted:
+                error("Failed to compact pending bestiary journal")
+            if to_generate:
+                warning("No new monsters to add - all descriptions failed to generate")
         
         # Generate summary report
         info("\n=== Bestiary Update Summary ===")
         info(f"Module scanned: {module_name}")
         info(f"Monsters requested: {len(monster_names)}")
+        info(f"Already in bestiary: {len(existing_monsters)}")
         info(f"Descriptions generated: {len(new_monsters)}")
         info(f"Failed to generate: {len(failed_monsters)}")
         if failed_monsters:
             info(f"Failed monsters: {', '.join(failed_monsters[:5])}{'...' if len(failed_monsters) > 5 else ''}")
         info(f"Test mode: {test_mode}")
         info("================================\n")
+    
+    async def process_missing_monsters_batch_api(self, module_name: str, monster_names: List[str],
+                                                 test_mode: bool = True,
+                                                 poll_interval: float = BATCH_POLL_INTERVAL) -> bool:
+        """
+        Non-interactive variant of process_missing_monsters using the OpenAI Batch API
+        
+        Requests are uploaded as one JSONL file and completed asynchronously by
+        OpenAI (half price, up to a 24h window), so this suits nightly or bulk
+        regenerations. Monsters the batch fails to produce are retried through
+        the interactive path; use process_missing_monsters when waiting is not
+        acceptable.
+        
+        Args:
+            module_name: Name of the module to extract context from
+            monster_names: List of monster names to process
+            test_mode: If True, write to test file instead of actual bestiary
+            poll_interval: Seconds between batch status checks
+            
+        Returns:
+            True if the batch finished and the bestiary was updated, False otherwise
+        """
+        if not self.client:
+            error("OpenAI client not available")
+            return False
+        
+        info(f"Starting Batch API bestiary update for {len(monster_names)} monsters from {module_name}")
+        prepared = await self._prepare_run(module_name, monster_names, test_mode)
+        if prepared is None:
+            return False
+        module_context, _existing, to_generate = prepared
+        
+        # Cached monsters need no request; one request line per remaining monster ID
+        new_monsters = {}
+        requests_by_id = {}
+        for monster_name in to_generate:
+            monster_id = monster_name_to_id(monster_name)
+            cached = self._read_cached(self._cache_path(monster_name, module_context))
+            if cached is not None:
+                new_monsters[monster_id] = cached
+            else:
+                requests_by_id.setdefault(monster_id, monster_name)
+        
+        if requests_by_id:
+            batch_input = b"".join(
+                _json_line({
+                    "custom_id": monster_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": _chat_body(_SYSTEM_PROMPT, _monster_user_prompt(monster_name, module_context))
+                })
+                for monster_id, monster_name in requests_by_id.items()
+            )
+            try:
+                batch_file = await self.client.files.create(
+                    file=(f"bestiary_{module_name}.jsonl", batch_input), purpose="batch")
+                batch = await self.client.batches.create(
+                    input_file_id=batch_file.id,
+                    endpoint="/v1/chat/completions",
+                    completion_window="24h"
+                )
+                info(f"Submitted batch {batch.id} with {len(requests_by_id)} monsters")
+                
+                while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                    await asyncio.sleep(poll_interval)
+                    batch = await self.client.batches.retrieve(batch.id)
+                    debug(f"Batch {batch.id} status: {batch.status}")
+                
+                output = b""
+                if batch.output_file_id:
+                    output = (await self.client.files.content(batch.output_file_id)).content
+                else:
+                    warning(f"Batch {batch.id} ended with status {batch.status} and no output")
+            except Exception as e:
+                error(f"Batch API request failed: {e}")
+                output = b""
+            
+            # Validate and sanitize each completed line like an interactive response
+            for line in output.splitlines():
+                try:
+                    entry = _json_loads(line)
+                    monster_id = entry["custom_id"]
+                    body = entry["response"]["body"]
+                    result = json.loads(body["choices"][0]["message"]["content"])
+                except (ValueError, KeyError, TypeError, IndexError):
+                    continue
+                monster_name = requests_by_id.get(monster_id)
+                if monster_name is None or _monster_errors(result):
+                    continue
+                self._finalize_result(result, monster_name)
+                self._write_cached(self._cache_path(monster_name, module_context), result)
+                new_monsters[monster_id] = result
+            
+            # Anything the batch did not produce goes through the interactive path
+            retry_names = [name for monster_id, name in requests_by_id.items() if monster_id not in new_monsters]
+            if retry_names:
+                warning(f"Batch did not produce {len(retry_names)} monsters, generating them directly")
+                batches = await asyncio.gather(*(
+                    self._generate_for_batch(retry_names[i:i + MONSTERS_PER_REQUEST], module_context,
+                                             i + 1, len(retry_names))
+                    for i in range(0, len(retry_names), MONSTERS_PER_REQUEST)
+                ))
+                for _name, monster_id, monster_data in (r for batch in batches for r in batch):
+                    if monster_data:
+                        new_monsters[monster_id] = monster_data
+        
+        if not new_monsters:
+            if to_generate:
+                warning("No new monsters to add - all descriptions failed to generate")
+            return not to_generate
+        
+        success = self.update_bestiary_safe(new_monsters, test_mode) and self.compact_bestiary(test_mode)
+        if success:
+            info(f"Batch API process complete! Added {len(new_monsters)} monsters to bestiary")
+        else:
+            error("Failed to update bestiary")
+        return success
 
 
 # Test function
@@ -426,6 +1051,54 @@ async def test_with_keep_of_doom():
     await updater.process_missing_monsters("Keep_of_Doom", test_monsters, test_mode=True)
 
 
+async def test_resume_after_interrupted_run():
+    """Test that monsters journaled by an interrupted run reach the bestiary on the next run
+    
+    Offline: module context and descriptions are stubbed, and the test bestiary files
+    are removed first.
+    """
+    updater = BestiaryUpdater()
+    bestiary_file, journal_file = updater._bestiary_files(test_mode=True)
+    for path in (Path(bestiary_file), journal_file):
+        if path.exists():
+            path.unlink()
+    
+    async def fake_batch(monster_names, module_context):
+        return {name: {"name": name, "description": f"A test {name}."} for name in monster_names}
+    
+    def make_updater():
+        resumed = BestiaryUpdater()
+        resumed.extract_all_area_context = lambda module_name: "Test module context."
+        resumed.generate_monster_descriptions_batch = fake_batch
+        return resumed
+    
+    # Interrupted run: the journal was written but compaction never happened
+    updater.update_bestiary_safe({"bog_mummy": {"name": "Bog Mummy", "description": "A test."}},
+                                 test_mode=True)
+    assert journal_file.exists()
+    
+    # Resumed run asks for the same monster again (plus a new one)
+    await make_updater().process_missing_monsters("Test_Module", ["Bog Mummy", "Animated Armor"],
+                                                  test_mode=True)
+    monsters = (safe_read_json(bestiary_file) or {}).get("monsters", {})
+    assert "bog_mummy" in monsters, "journaled monster missing from bestiary"
+    assert "animated_armor" in monsters
+    assert not journal_file.exists()
+    
+    # A resumed run that generates nothing new must still compact the journal
+    updater.update_bestiary_safe({"shadow_wraith": {"name": "Shadow Wraith", "description": "A test."}},
+                                 test_mode=True)
+    await make_updater().process_missing_monsters("Test_Module", ["Bog Mummy"], test_mode=True)
+    monsters = (safe_read_json(bestiary_file) or {}).get("monsters", {})
+    assert "shadow_wraith" in monsters, "journal not compacted when nothing was generated"
+    assert not journal_file.exists()
+    info("test_resume_after_interrupted_run passed")
+
+
 if __name__ == "__main__":
-    # Run test
-    asyncio.run(test_with_keep_of_doom())
\ No newline at end of file
+    import sys
+    # Run test (--test-resume runs the offline interrupted-run test instead)
+    if "--test-resume" in sys.argv:
+        asyncio.run(test_resume_after_interrupted_run())
+    else:
+        asyncio.run(test_with_keep_of_doom())
\ No newline at end of file
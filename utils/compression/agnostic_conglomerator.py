@@ -11,18 +11,36 @@ Agnostic Conversation Conglomerator (dialogue-only)
 - Preserves *all* combat/location markers and assistant messages that start combat.
 - Keeps the last N turns verbatim (default 5).
 - CLI: analyze | conglomerate | drop-temp | test
+  (conglomerate --glob processes many files in parallel)
 
 Input/Output JSON format: list[ { "role": "user"|"assistant", "content": "..." }, ... ]
 Assistant messages may contain JSON in content (e.g., { "narration": "...", "actions": [...] }).
 """
 
 import json
+import os
 import re
+import glob
 import argparse
+import multiprocessing
 from typing import List, Dict, Any, Tuple, Optional
 from copy import deepcopy
 from collections import Counter
 
+try:
+    import re2  # google-re2: linear-time DFA matching, no catastrophic backtracking
+    _RE2_OPTIONS = re2.Options()
+    _RE2_OPTIONS.log_errors = False
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+try:
+    import orjson  # C serializer; several times faster on large conversations
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # -----------------------------
 # Configuration (edit as needed)
 # -----------------------------
@@ -93,20 +111,153 @@ DEFAULT_CONFIG: Dict[str, Any] = {
 # -----------------------------
 # Compiled config for fast use
 # -----------------------------
+def _compile(pattern: str) -> re.Pattern:
+    """Compile with re2 when installed, else re.
+
+    Patterns scan untrusted model output, so the linear-time engine is
+    preferred. Anything re2 rejects (lookarounds, backreferences) falls back
+    to re. Note re2's \\s, \\b and \\w are ASCII-only.
+    """
+    if RE2_AVAILABLE:
+        try:
+            return re2.compile(pattern, _RE2_OPTIONS)
+        except re2.error:
+            pass
+    return re.compile(pattern)
+
 def _compile_patterns(patterns: List[str]) -> List[re.Pattern]:
-    return [re.compile(p) for p in patterns]
+    return [_compile(p) for p in patterns]
+
+_LEADING_FLAGS_RE = re.compile(r"^\(\?([aiLmsux]+)\)")
+
+def _scoped(pattern: str) -> str:
+    """Wrap a pattern as a group; leading global flags such as (?i) become (?i:...)."""
+    m = _LEADING_FLAGS_RE.match(pattern)
+    return f"(?{m.group(1)}:{pattern[m.end():]})" if m else f"(?:{pattern})"
+
+def _fuse_sources(patterns: List[str], named: bool = False) -> str:
+    """One alternation matching wherever any of `patterns` matches.
+
+    Global flags are only allowed at the very start of an expression, so each
+    pattern is scoped first. With `named`, alternative i is captured as group
+    "p{i}", so match.lastgroup tells which pattern matched.
+    """
+    if not patterns:
+        return r"(?!)"  # never matches
+    if named:
+        return "|".join(f"(?P<p{i}>{_scoped(p)})" for i, p in enumerate(patterns))
+    return "|".join(_scoped(p) for p in patterns)
+
+def _fuse_patterns(patterns: List[str], named: bool = False) -> re.Pattern:
+    # re2 rejects the empty-list lookahead; _compile falls back to re for it
+    return _compile(_fuse_sources(patterns, named))
+
+_REGEX_META = set(".^$*+?{}[]()|\\")
+_QUANTIFIERS = set("*+?{")
+# (case-sensitive needles, lowercased case-insensitive needles); None disables the prefilter
+Needles = Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]
+
+def _required_literal(pattern: str) -> Optional[Tuple[str, bool]]:
+    """Leading literal text that every match of `pattern` must contain.
+
+    Returns (literal, ignorecase), or None when no safe literal can be derived
+    (alternation, verbose mode, or no literal prefix at all).
+    """
+    flags = ""
+    m = _LEADING_FLAGS_RE.match(pattern)
+    if m:
+        flags, pattern = m.group(1), pattern[m.end():]
+    if "x" in flags or "|" in pattern:
+        return None
+    i = 0
+    # leading zero-width assertions don't consume text
+    while pattern.startswith(("^", "\\A", "\\b", "\\B"), i):
+        i += 1 if pattern[i] == "^" else 2
+    lit: List[str] = []
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            nxt = pattern[i + 1:i + 2]
+            if not nxt or nxt.isalnum():
+                break  # class escape (\s, \b, ...) or backreference
+            ch, step = nxt, 2
+        elif ch in _REGEX_META:
+            break
+        else:
+            step = 1
+        lit.append(ch)
+        i += step
+    if i < len(pattern) and pattern[i] in _QUANTIFIERS and lit:
+        lit.pop()  # the last char is optional or repeated
+    literal = "".join(lit)
+    if not literal:
+        return None
+    ignorecase = "i" in flags
+    if ignorecase and not literal.isascii():
+        return None
+    return literal, ignorecase
+
+def _literal_prefilter(patterns: List[str]) -> Needles:
+    """Needles covering every pattern, or None if any pattern lacks a required literal."""
+    exact: List[str] = []
+    folded: List[str] = []
+    for p in patterns:
+        req = _required_literal(p)
+        if req is None:
+            return None
+        literal, ignorecase = req
+        (folded if ignorecase else exact).append(literal.lower() if ignorecase else literal)
+    return tuple(exact), tuple(folded)
+
+def may_match(text: str, literals: Needles) -> bool:
+    """Cheap substring pre-check; False only if no pattern of the group can match."""
+    if literals is None:
+        return True
+    exact, folded = literals
+    for needle in exact:
+        if needle in text:
+            return True
+    if folded:
+        if not text.isascii():
+            return True  # re's case folding is wider than str.lower() outside ASCII
+        lowered = text.lower()
+        for needle in folded:
+            if needle in lowered:
+                return True
+    return False
+
+_CURRENT_LOCATION = r"^Current Location:\s*\{"
 
 class CompiledConfig:
     def __init__(self, cfg: Dict[str, Any]):
         self.cfg = cfg
         self.transition_markers = _compile_patterns(cfg["transition_markers"])
         self.preserve_exact = _compile_patterns(cfg["preserve_exact"])
-        self.user_prefix_strip = _compile_patterns(cfg["user_prefix_strip"])
-        self.meta_user_prefixes = [re.compile(p) for p in cfg["meta_user_prefixes"]]
-        self.system_pairs = [(re.compile(a), re.compile(b)) for a, b in cfg["system_pairs"]]
-        self.candidate_action_keys = cfg["candidate_action_keys"]
-        self.assistant_combat_actions = {a.lower() for a in cfg["assistant_combat_actions"]}
+        # Short user turns: re beats re2's per-call overhead here. Each pattern
+        # carries its own literal prefilter so absent labels skip the sub().
+        self.user_prefix_strip = [re.compile(p) for p in cfg["user_prefix_strip"]]
+        self.user_prefix_strip_literals = [_literal_prefilter([p]) for p in cfg["user_prefix_strip"]]
+        self.meta_user_prefixes = _compile_patterns(cfg["meta_user_prefixes"])
+        # One fused search per message instead of one per pattern
+        self.transition_markers_any = _fuse_patterns(cfg["transition_markers"])
+        self.preserve_exact_any = _fuse_patterns(cfg["preserve_exact"])
+        self.meta_user_prefixes_any = _fuse_patterns(cfg["meta_user_prefixes"])
+        # Literal needles checked with `in` before running the fused regexes
+        self.transition_literals = _literal_prefilter(cfg["transition_markers"])
+        self.preserve_literals = _literal_prefilter(cfg["preserve_exact"])
+        # Fallback start-of-area marker when no transition is present
+        self.current_location_re = _compile(_CURRENT_LOCATION)
+        self.current_location_literals = _literal_prefilter([_CURRENT_LOCATION])
+        self.system_pairs = [(_compile(a), _compile(b)) for a, b in cfg["system_pairs"]]
+        self.system_pair_a = _fuse_patterns([a for a, _ in cfg["system_pairs"]], named=True)
+        self.candidate_action_keys = tuple(cfg["candidate_action_keys"])
+        self.assistant_combat_actions = frozenset(a.lower() for a in cfg["assistant_combat_actions"])
+        # Configured spellings plus lowercase, so exact-case hits skip .lower()
+        self.assistant_combat_actions_ci = self.assistant_combat_actions | frozenset(cfg["assistant_combat_actions"])
+        # Param keys are short, trusted strings where re2's per-call overhead
+        # outweighs its linear-time guarantee, so these stay on re
         self.interesting_param_patterns = [re.compile(p, re.I) for p in cfg["interesting_param_patterns"]]
+        self.interesting_param_any = re.compile(_fuse_sources(["(?i)" + p for p in cfg["interesting_param_patterns"]]))
 
         self.keep_recent_turns = cfg["keep_recent_turns"]
         self.min_messages = cfg["min_messages"]
@@ -117,73 +268,129 @@ class CompiledConfig:
         self.max_depth = cfg["max_depth"]
         self.lossless_params_fallback = cfg["lossless_params_fallback"]
 
+# Compiled bundles keyed by the serialized config, so callers may pass fresh or
+# mutated dicts safely; bounded to the most recent few configs
+_COMPILED_CACHE: Dict[str, CompiledConfig] = {}
+_COMPILED_CACHE_SIZE = 8
+
+def get_compiled(cfg: Dict[str, Any]) -> CompiledConfig:
+    key = json.dumps(cfg, sort_keys=True, default=str)
+    CC = _COMPILED_CACHE.get(key)
+    if CC is None:
+        if len(_COMPILED_CACHE) >= _COMPILED_CACHE_SIZE:
+            _COMPILED_CACHE.pop(next(iter(_COMPILED_CACHE)))
+        CC = _COMPILED_CACHE[key] = CompiledConfig(deepcopy(cfg))
+    return CC
+
 # -----------------------------
 # Small utilities
 # -----------------------------
+def _loads(data: bytes) -> Any:
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN literals, which json accepts
+    return json.loads(data.decode("utf-8"))
+
+def _dumps_pretty(data: Any) -> bytes:
+    """UTF-8 JSON laid out like json.dumps(data, ensure_ascii=False, indent=2)."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
 def load_json(path: str) -> Any:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(path, "rb") as f:
+        return _loads(f.read())
 
 def save_json(path: str, data: Any) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    _write_bytes(path, _dumps_pretty(data))
+
+def _write_bytes(path: str, buf: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(buf)
 
 def chars_to_tokens_estimate(chars: int) -> int:
     return max(1, chars // 4)
 
-def message_chars(messages: List[Dict[str, Any]]) -> int:
-    return sum(len(m.get("content", "")) for m in messages)
-
-def find_last_index_where(patterns: List[re.Pattern], messages: List[Dict[str, Any]]) -> int:
-    for i in range(len(messages) - 1, -1, -1):
-        c = messages[i].get("content", "")
-        if any(p.search(c) for p in patterns):
+def message_columns(messages: List[Dict[str, Any]]) -> Tuple[List[str], List[str], List[int]]:
+    """Parallel content, role and content-length lists, built once per pass so
+    the scans below index plain lists instead of re-reading each message dict."""
+    contents = [m.get("content", "") or "" for m in messages]
+    roles = [m.get("role", "") for m in messages]
+    lens = [len(c) for c in contents]
+    return contents, roles, lens
+
+def find_last_index_where(pattern: re.Pattern, contents: List[str], literals: Needles = None) -> int:
+    search = pattern.search
+    for i in range(len(contents) - 1, -1, -1):
+        if may_match(contents[i], literals) and search(contents[i]):
             return i
     return -1
 
 def strip_user_prefixes(text: str, CC: CompiledConfig) -> str:
     out = text
-    for p in CC.user_prefix_strip:
-        out = p.sub("", out)
+    for p, literals in zip(CC.user_prefix_strip, CC.user_prefix_strip_literals):
+        if may_match(out, literals):
+            out = p.sub("", out)
     return out.strip()
 
 # -----------------------------
 # Classification helpers
 # -----------------------------
 def is_meta_user_turn(text: str, CC: CompiledConfig) -> bool:
-    t = text.strip()
-    return any(p.search(t) for p in CC.meta_user_prefixes)
+    return CC.meta_user_prefixes_any.search(text.strip()) is not None
 
 def parse_assistant_json_safe(content: str) -> Optional[Dict[str, Any]]:
+    # Plain-text narration is the common case; callers only use objects and
+    # arrays, so skip the raising json.loads unless one could start here
+    # (json.loads itself only skips these four whitespace characters)
+    if isinstance(content, str) and content.lstrip(" \t\n\r")[:1] not in ("{", "["):
+        return None
     try:
         return json.loads(content)
     except Exception:
         return None
 
-def is_assistant_combat_message(msg: Dict[str, Any], CC: CompiledConfig) -> bool:
+def assistant_payload(msg: Dict[str, Any], parsed: Optional[Dict[int, Any]] = None) -> Any:
+    """Parsed JSON of an assistant message, memoized in `parsed` (keyed by id(msg)) if given."""
+    if parsed is None:
+        return parse_assistant_json_safe(msg.get("content", ""))
+    key = id(msg)
+    if key not in parsed:
+        parsed[key] = parse_assistant_json_safe(msg.get("content", ""))
+    return parsed[key]
+
+def is_assistant_combat_message(msg: Dict[str, Any], CC: CompiledConfig,
+                                parsed: Optional[Dict[int, Any]] = None) -> bool:
     if msg.get("role") != "assistant":
         return False
-    payload = parse_assistant_json_safe(msg.get("content", ""))
+    payload = assistant_payload(msg, parsed)
     if not isinstance(payload, dict):
         return False
     # examine candidate action arrays
+    combat, combat_ci = CC.assistant_combat_actions, CC.assistant_combat_actions_ci
     for key in CC.candidate_action_keys:
         arr = payload.get(key)
         if isinstance(arr, list):
             for act in arr:
                 if isinstance(act, dict):
-                    a_type = (act.get("action") or act.get("type") or "").lower()
-                    if a_type in CC.assistant_combat_actions:
+                    a_type = act.get("action") or act.get("type") or ""
+                    if a_type in combat_ci or a_type.lower() in combat:
                         return True
     return False
 
-def is_preserved_message(msg: Dict[str, Any], CC: CompiledConfig) -> bool:
+def is_preserved_message(msg: Dict[str, Any], CC: CompiledConfig,
+                         parsed: Optional[Dict[int, Any]] = None) -> bool:
     content = msg.get("content", "")
     # 1) explicit markers (combat summaries, current location blocks)
-    if any(p.search(content) for p in CC.preserve_exact):
+    if may_match(content, CC.preserve_literals) and CC.preserve_exact_any.search(content):
         return True
     # 2) assistant messages that start/commit combat
-    if is_assistant_combat_message(msg, CC):
+    if is_assistant_combat_message(msg, CC, parsed):
         return True
     return False
 
@@ -195,25 +402,24 @@ def sweep_trivial_system_pairs(messages: List[Dict[str, Any]], CC: CompiledConfi
             m1, m2 = messages[i], messages[i+1]
             if m1.get("role") == "user" and m2.get("role") == "assistant":
                 c1 = (m1.get("content", "") or "").strip()
-                c2 = (m2.get("content", "") or "").strip()
-                for a_pat, b_pat in CC.system_pairs:
-                    if a_pat.match(c1) and b_pat.match(c2):
+                # One fused match finds the first pair whose first half matches;
+                # only then check second halves from that pair onward
+                hit = CC.system_pair_a.match(c1)
+                if hit:
+                    c2 = (m2.get("content", "") or "").strip()
+                    first = int(hit.lastgroup[1:])
+                    if any(a_pat.match(c1) and b_pat.match(c2) for a_pat, b_pat in CC.system_pairs[first:]):
                         i += 2
-                        break
-                else:
-                    out.append(messages[i])
-                    i += 1
-                    continue
-                continue
+                        continue
         out.append(messages[i])
         i += 1
     return out
 
-def find_active_history_start(messages: List[Dict[str, Any]], CC: CompiledConfig) -> int:
-    idx = find_last_index_where(CC.transition_markers, messages)
+def find_active_history_start(contents: List[str], CC: CompiledConfig) -> int:
+    idx = find_last_index_where(CC.transition_markers_any, contents, CC.transition_literals)
     if idx != -1:
         return idx + 1
-    idx = find_last_index_where([re.compile(r"^Current Location:\s*\{")], messages)
+    idx = find_last_index_where(CC.current_location_re, contents, CC.current_location_literals)
     if idx != -1:
         return idx + 1
     return 0
@@ -225,48 +431,109 @@ def _clip_string(s: str, limit: int) -> str:
     return s if len(s) <= limit else s[:limit - 1] + "..."
 
 def _json_size(obj: Any) -> int:
+    """len(json.dumps(obj, ensure_ascii=False)), skipping the encoder for plain
+    strings and ints whose serialized length is known up front."""
+    t = type(obj)
+    if t is str:
+        # nothing to escape: the quotes are the only extra characters
+        if obj.isprintable() and '"' not in obj and "\\" not in obj:
+            return len(obj) + 2
+    elif t is int:
+        return len(repr(obj))
+    elif obj is None or t is bool:
+        return 5 if obj is False else 4
     try:
         return len(json.dumps(obj, ensure_ascii=False))
     except Exception:
         return 0
 
-def _compress_value(v: Any, CC: CompiledConfig, depth: int) -> Any:
+def _compress_sized(v: Any, CC: CompiledConfig, depth: int) -> Tuple[Any, int]:
+    """Compress `v` and return it with its exact json.dumps size.
+
+    Container sizes are accumulated from their children (brackets plus ", " and
+    ": " separators) instead of re-serializing the partial output after every
+    item, which made the budget checks quadratic.
+    """
     if depth > CC.max_depth:
-        return None
+        return None, 4  # null
     if isinstance(v, str):
-        return _clip_string(v, CC.max_str_len)
+        v = _clip_string(v, CC.max_str_len)
+        return v, _json_size(v)
     if isinstance(v, (int, float, bool)) or v is None:
-        return v
+        return v, _json_size(v)
     if isinstance(v, list):
         out = []
+        size = 2  # []
         for item in v:
-            out.append(_compress_value(item, CC, depth + 1))
-            if _json_size(out) > CC.params_budget_bytes:
+            child, child_size = _compress_sized(item, CC, depth + 1)
+            size += child_size + (2 if out else 0)
+            out.append(child)
+            if size > CC.params_budget_bytes:
                 break
-        return out
+        return out, size
     if isinstance(v, dict):
         out = {}
+        size = 2  # {}
         for k, val in v.items():
-            out[k] = _compress_value(val, CC, depth + 1)
-            if _json_size(out) > CC.params_budget_bytes:
+            child, child_size = _compress_sized(val, CC, depth + 1)
+            # '"key": ' plus the ", " separator after the first entry
+            size += _json_size(k if isinstance(k, str) else str(k)) + 2 + child_size + (2 if out else 0)
+            out[k] = child
+            if size > CC.params_budget_bytes:
                 break
-        return out
-    return str(v)
+        return out, size
+    v = str(v)
+    return v, _json_size(v)
+
+def _compress_value(v: Any, CC: CompiledConfig, depth: int) -> Any:
+    return _compress_sized(v, CC, depth)[0]
 
 def _keep_interesting_keys(params: Dict[str, Any], CC: CompiledConfig) -> Dict[str, Any]:
     keep: Dict[str, Any] = {}
+    search = CC.interesting_param_any.search
     for k, v in params.items():
-        if any(p.search(k) for p in CC.interesting_param_patterns):
+        if search(k):
             keep[k] = v
     return keep
 
+# Dicts up to this many keys are checked for the unchanged-output fast path
+_SMALL_PARAMS = 4
+
+def _fits_as_is(params: Dict[str, Any], CC: CompiledConfig) -> bool:
+    """True if compress_params would return an equal dict: every value is a
+    scalar that compression leaves alone, the whole fits the budget, and the
+    preferred-key filter would keep either all keys or none."""
+    if CC.max_depth < 1:
+        return False
+    search = CC.interesting_param_any.search
+    size = 2 * len(params)  # {} plus ", " between entries
+    preferred = 0
+    for k, v in params.items():
+        if type(k) is not str:
+            return False
+        t = type(v)
+        if t is str:
+            if len(v) > CC.max_str_len:
+                return False
+        elif not (v is None or t is int or t is float or t is bool):
+            return False
+        size += _json_size(k) + 2 + _json_size(v)
+        if search(k):
+            preferred += 1
+    return size <= CC.params_budget_bytes and preferred in (0, len(params))
+
 def compress_params(params: Any, CC: CompiledConfig) -> Any:
     if not isinstance(params, dict):
         return _compress_value(params, CC, 0)
+    # Fast paths for the common empty and tiny flat parameter dicts
+    if not params:
+        return params if CC.lossless_params_fallback else {}
+    if len(params) <= _SMALL_PARAMS and _fits_as_is(params, CC):
+        return params
     preferred = _keep_interesting_keys(params, CC)
     if preferred:
-        compact = _compress_value(preferred, CC, 0)
-        if _json_size(compact) <= CC.params_budget_bytes:
+        compact, size = _compress_sized(preferred, CC, 0)
+        if size <= CC.params_budget_bytes:
             return compact
     compact = _compress_value(params, CC, 0)
     if compact and (compact != {} or not CC.lossless_params_fallback):
@@ -276,21 +543,28 @@ def compress_params(params: Any, CC: CompiledConfig) -> Any:
 # -----------------------------
 # Conglomeration logic
 # -----------------------------
-def should_conglomerate(active_block: List[Dict[str, Any]], CC: CompiledConfig) -> bool:
-    if not active_block:
+def should_conglomerate(active_lens: List[int], CC: CompiledConfig,
+                        user_count: Optional[int] = None) -> bool:
+    """`active_lens` holds the content length of each message in the active
+    block; `user_count`, if given, its number of user messages."""
+    if not active_lens:
+        return False
+    if len(active_lens) < CC.min_messages:
         return False
-    if len(active_block) < CC.min_messages:
+    # Each absorbed turn is a user message, so too few users can never reach
+    # min_noncombat_turns; bail before the TEMP-building pass
+    if user_count is not None and user_count < CC.min_noncombat_turns:
         return False
-    if message_chars(active_block) < CC.min_chars:
+    if sum(active_lens) < CC.min_chars:
         return False
     # keep recent turns: 2 messages per turn
-    turns = len(active_block) // 2
+    turns = len(active_lens) // 2
     if turns <= CC.keep_recent_turns:
         return False
     return True
 
 def conglomerate_active_history(messages: List[Dict[str, Any]], cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
-    CC = CompiledConfig(cfg)
+    CC = get_compiled(cfg)
     if not messages:
         return messages
 
@@ -298,28 +572,34 @@ def conglomerate_active_history(messages: List[Dict[str, Any]], cfg: Dict[str, A
     messages = sweep_trivial_system_pairs(messages, CC)
 
     # 2) slice the active area (after the last transition)
-    start = find_active_history_start(messages, CC)
+    contents, roles, lens = message_columns(messages)
+    start = find_active_history_start(contents, CC)
     cutoff = max(start, len(messages) - (CC.keep_recent_turns * 2))
-    active = messages[start:cutoff]
-    if not should_conglomerate(active, CC):
+    user_count = roles[start:cutoff].count("user")
+    if not should_conglomerate(lens[start:cutoff], CC, user_count):
         return messages
-
-    # 3) build TEMP content from *non-preserved* pairs only
+    active = messages[start:cutoff]
+    active_contents = contents[start:cutoff]
+    active_roles = roles[start:cutoff]
+
+    # 3) build TEMP content from *non-preserved* pairs only. Each message is
+    #    classified once up front (assistant JSON parsed at most once) and the
+    #    rebuild below only reads these flags.
+    parsed: Dict[int, Any] = {}
+    # Never absorb preserved messages (combat summaries, location blocks, assistant combat starters)
+    preserved = [is_preserved_message(msg, CC, parsed) for msg in active]
     user_turns: List[str] = []
     outcomes: List[Dict[str, Any]] = []
     actions_digest: List[Dict[str, Any]] = []
 
     i = 0
     while i < len(active):
-        msg = active[i]
-
-        # Never absorb preserved messages (combat summaries, location blocks, assistant combat starters)
-        if is_preserved_message(msg, CC):
+        if preserved[i]:
             i += 1
             continue
 
-        if msg.get("role") == "user":
-            raw = strip_user_prefixes(msg.get("content", ""), CC)
+        if active_roles[i] == "user":
+            raw = strip_user_prefixes(active_contents[i], CC)
             if is_meta_user_turn(raw, CC):
                 i += 1
                 continue
@@ -328,10 +608,9 @@ def conglomerate_active_history(messages: List[Dict[str, Any]], cfg: Dict[str, A
                 user_turns.append(raw)
 
             # Pair with next assistant if present and not preserved
-            if i + 1 < len(active) and active[i + 1].get("role") == "assistant":
-                nxt = active[i + 1]
-                if not is_preserved_message(nxt, CC):
-                    payload = parse_assistant_json_safe(nxt.get("content", ""))
+            if i + 1 < len(active) and active_roles[i + 1] == "assistant":
+                if not preserved[i + 1]:
+                    payload = assistant_payload(active[i + 1], parsed)
                     if isinstance(payload, dict):
                         nar = payload.get("narration")
                         if isinstance(nar, str) and nar.strip():
@@ -350,7 +629,7 @@ def conglomerate_active_history(messages: List[Dict[str, Any]], cfg: Dict[str, A
                                         })
                     else:
                         # Plain-text assistant content — keep as outcome
-                        txt = nxt.get("content", "").strip()
+                        txt = active_contents[i + 1].strip()
                         if txt:
                             outcomes.append({"turn": len(user_turns), "text": txt})
                     i += 1  # consumed the assistant
@@ -382,7 +661,7 @@ def conglomerate_active_history(messages: List[Dict[str, Any]], cfg: Dict[str, A
     }
     temp_assistant = {
         "role": "assistant",
-        "content": json.dumps(temp_asst_payload, ensure_ascii=False, indent=2)
+        "content": _dumps_pretty(temp_asst_payload).decode("utf-8")
     }
 
     # 5) Rebuild the active slice *in order*:
@@ -391,22 +670,12 @@ def conglomerate_active_history(messages: List[Dict[str, Any]], cfg: Dict[str, A
     #    - skip the summarized (non-preserved) messages
     rebuilt: List[Dict[str, Any]] = []
     inserted = False
-    i = 0
-    while i < len(active):
-        msg = active[i]
-        if is_preserved_message(msg, CC):
+    for msg, keep in zip(active, preserved):
+        if keep:
             rebuilt.append(msg)  # keep in place
-        else:
-            if not inserted:
-                rebuilt.extend([temp_user, temp_assistant])
-                inserted = True
-            # skip this non-preserved msg (and its paired assistant if applicable)
-            if (msg.get("role") == "user" and
-                i + 1 < len(active) and
-                active[i + 1].get("role") == "assistant" and
-                not is_preserved_message(active[i + 1], CC)):
-                i += 1  # skip the assistant, too
-        i += 1
+        elif not inserted:
+            rebuilt.extend([temp_user, temp_assistant])
+            inserted = True
 
     if not inserted:
         # Edge: nothing to replace — do nothing.
@@ -435,20 +704,16 @@ def drop_temp_conglomerates(messages: List[Dict[str, Any]]) -> List[Dict[str, An
 # -----------------------------
 # Analysis helpers (for reports)
 # -----------------------------
-def count_marker_hits(messages: List[Dict[str, Any]], patterns: List[re.Pattern]) -> int:
-    n = 0
-    for m in messages:
-        c = m.get("content", "")
-        if any(p.search(c) for p in patterns):
-            n += 1
-    return n
+def count_marker_hits(contents: List[str], pattern: re.Pattern, literals: Needles = None) -> int:
+    search = pattern.search
+    return sum(1 for c in contents if may_match(c, literals) and search(c))
 
-def scan_actions(messages: List[Dict[str, Any]], CC: CompiledConfig) -> List[str]:
+def scan_actions(contents: List[str], roles: List[str], CC: CompiledConfig) -> List[str]:
     types: List[str] = []
-    for m in messages:
-        if m.get("role") != "assistant":
+    for content, role in zip(contents, roles):
+        if role != "assistant":
             continue
-        payload = parse_assistant_json_safe(m.get("content", ""))
+        payload = parse_assistant_json_safe(content)
         if not isinstance(payload, dict):
             continue
         for key in CC.candidate_action_keys:
@@ -460,22 +725,24 @@ def scan_actions(messages: List[Dict[str, Any]], CC: CompiledConfig) -> List[str
                         types.append(a_type)
     return types
 
-def scan_temp_pair(messages: List[Dict[str, Any]]) -> Tuple[int, int]:
-    user_temp = sum(1 for m in messages if m.get("role") == "user" and "=== TEMP_CONGLOMERATE_START ===" in m.get("content", ""))
-    asst_temp = sum(1 for m in messages if m.get("role") == "assistant" and "conglomerated_history" in (m.get("content", "") or ""))
+def scan_temp_pair(contents: List[str], roles: List[str]) -> Tuple[int, int]:
+    pairs = list(zip(contents, roles))
+    user_temp = sum(1 for c, r in pairs if r == "user" and "=== TEMP_CONGLOMERATE_START ===" in c)
+    asst_temp = sum(1 for c, r in pairs if r == "assistant" and "conglomerated_history" in c)
     return user_temp, asst_temp
 
 def analyze_conversation(messages: List[Dict[str, Any]], cfg: Dict[str, Any]) -> Dict[str, Any]:
-    CC = CompiledConfig(cfg)
-    total_chars = message_chars(messages)
+    CC = get_compiled(cfg)
+    contents, roles, lens = message_columns(messages)
+    total_chars = sum(lens)
     token_est = chars_to_tokens_estimate(total_chars)
     markers = {
-        "transitions": count_marker_hits(messages, CC.transition_markers),
-        "preserve_exact": count_marker_hits(messages, CC.preserve_exact),
+        "transitions": count_marker_hits(contents, CC.transition_markers_any, CC.transition_literals),
+        "preserve_exact": count_marker_hits(contents, CC.preserve_exact_any, CC.preserve_literals),
     }
-    action_types = scan_actions(messages, CC)
+    action_types = scan_actions(contents, roles, CC)
     hist = dict(Counter(action_types))
-    temp_user_count, temp_asst_count = scan_temp_pair(messages)
+    temp_user_count, temp_asst_count = scan_temp_pair(contents, roles)
     return {
         "messages": len(messages),
         "chars": total_chars,
@@ -488,13 +755,35 @@ def analyze_conversation(messages: List[Dict[str, Any]], cfg: Dict[str, Any]) ->
 # -----------------------------
 # CLI
 # -----------------------------
+def _conglomerate_file(job: Tuple[str, str]) -> str:
+    """Pool worker: conglomerate one file. Each worker process compiles the
+    default config once through get_compiled() and reuses it for every file."""
+    in_path, out_path = job
+    save_json(out_path, conglomerate_active_history(load_json(in_path), DEFAULT_CONFIG))
+    return out_path
+
+def conglomerate_many(pattern: str, out_dir: str, workers: Optional[int] = None) -> List[str]:
+    """Conglomerate every file matching `pattern` into `out_dir` (same base names)."""
+    files = sorted(glob.glob(pattern))
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(path, os.path.join(out_dir, os.path.basename(path))) for path in files]
+    if not jobs:
+        return []
+    with multiprocessing.Pool(min(workers or os.cpu_count() or 1, len(jobs))) as pool:
+        return pool.map(_conglomerate_file, jobs)
+
 def cli_main():
     parser = argparse.ArgumentParser(description="Agnostic dialogue-only conglomerator (no combat absorption)")
     sub = parser.add_subparsers(dest="cmd")
 
     p_conglom = sub.add_parser("conglomerate", help="Create a dialogue-only TEMP pair in the active area")
-    p_conglom.add_argument("--in", dest="in_path", required=True)
-    p_conglom.add_argument("--out", dest="out_path", required=True)
+    p_conglom.add_argument("--in", dest="in_path")
+    p_conglom.add_argument("--out", dest="out_path", required=True,
+                           help="Output file, or output directory with --glob")
+    p_conglom.add_argument("--glob", dest="glob_pattern",
+                           help="Conglomerate every matching file in parallel instead of --in")
+    p_conglom.add_argument("--workers", type=int, default=None,
+                           help="Worker processes for --glob (default: CPU count)")
 
     p_drop = sub.add_parser("drop-temp", help="Remove any TEMP conglomerate pairs")
     p_drop.add_argument("--in", dest="in_path", required=True)
@@ -510,9 +799,15 @@ def cli_main():
     p_test.add_argument("--report", dest="report_path", required=True)
 
     args = parser.parse_args()
-    cfg = deepcopy(DEFAULT_CONFIG)
+    cfg = DEFAULT_CONFIG  # read-only: get_compiled() keeps its own copy
+
+    if args.cmd == "conglomerate" and args.glob_pattern:
+        written = conglomerate_many(args.glob_pattern, args.out_path, args.workers)
+        print(f"[OK] Wrote {len(written)} conglomerated conversations -> {args.out_path}")
 
-    if args.cmd == "conglomerate":
+    elif args.cmd == "conglomerate":
+        if not args.in_path:
+            parser.error("conglomerate requires --in or --glob")
         data = load_json(args.in_path)
         out = conglomerate_active_history(data, cfg)
         save_json(args.out_path, out)
@@ -527,9 +822,11 @@ def cli_main():
     elif args.cmd == "analyze":
         data = load_json(args.in_path)
         report = analyze_conversation(data, cfg)
-        print(json.dumps(report, indent=2, ensure_ascii=False))
+        # serialize once for both stdout and the report file
+        buf = _dumps_pretty(report)
+        print(buf.decode("utf-8"))
         if args.report_path:
-            save_json(args.report_path, report)
+            _write_bytes(args.report_path, buf)
             print(f"[OK] Wrote analysis report -> {args.report_path}")
 
     elif args.cmd == "test":
@@ -553,8 +850,9 @@ def cli_main():
             },
         }
         save_json(args.out_path, conglomerated)
-        save_json(args.report_path, report)
-        print(json.dumps(report, indent=2, ensure_ascii=False))
+        buf = _dumps_pretty(report)
+        _write_bytes(args.report_path, buf)
+        print(buf.decode("utf-8"))
         print(f"[OK] Wrote conglomerated -> {args.out_path}")
         print(f"[OK] Wrote test report -> {args.report_path}")
 
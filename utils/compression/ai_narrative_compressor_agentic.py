@@ -9,17 +9,68 @@ Converts fantasy narrative to ultra-compact EVT notation format
 """
 
 import json
+import os
 import sys
 import re
-from typing import Dict, Any, List
+import hashlib
+import shutil
+import tempfile
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
+import httpx
 from openai import OpenAI
 
+# orjson encodes/decodes large passages several times faster; fall back to stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    def _json_pretty_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+    def _json_pretty_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+try:
+    import re2  # google-re2: linear-time matching for model-generated beat lines
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# One pooled transport shared by every call (compress_batch runs BATCH_MAX_WORKERS at once)
+HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+HTTP_TIMEOUT = 60.0
+
+def _build_http_client() -> httpx.Client:
+    """HTTP/2 client so concurrent requests multiplex over one connection; HTTP/1.1 without h2"""
+    try:
+        return httpx.Client(http2=True, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    except ImportError:
+        return httpx.Client(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+
 # Load API configuration
 try:
     import config
     from model_config import NARRATIVE_COMPRESSION_MODEL
-    client = OpenAI(api_key=config.OPENAI_API_KEY)
+    client = OpenAI(api_key=config.OPENAI_API_KEY, http_client=_build_http_client())
 except ImportError as e:
     print(f"ERROR: Missing configuration file - {e}")
     print("Please ensure both config.py (with OPENAI_API_KEY) and model_config.py exist")
@@ -33,7 +84,9 @@ except:
     USAGE_TRACKING_AVAILABLE = False
     def track_response(r): pass  # No-op fallback
 
-# System prompt for GPT-4.1-mini (Agentic approach)
+# System prompt for GPT-4.1-mini (Agentic approach). Sent first and byte-identical
+# on every call so the provider's automatic prefix cache can reuse it; keep all
+# per-call values (CONFIG, retry hints) in user messages, never interpolated here.
 SYSTEM_PROMPT = """# SYSTEM PROMPT — Agentic Slimline Compressor (for GPT-4.1-mini)
 
 You are an **agentic compressor**. Your job is to read a fantasy narrative passage and produce a compact, readable **slimline** representation that we can store and later expand. You must **think through the task internally**, run a **self-check**, repair your own draft if needed, and then return **only the final JSON** described below (no notes, no explanations).
@@ -149,6 +202,237 @@ Notes:
 
 If any check fails, **repair your block** and re-run the rubric. Return only the final JSON."""
 
+# Opt-in on-disk response cache for dev/replay runs (NARRATIVE_COMPRESSOR_CACHE=1).
+# Content-addressed as CACHE_DIR/<prompt hash>/<payload hash>.json, so separate
+# processes and workers can share one directory and a prompt edit starts a fresh subtree.
+CACHE_DIR = Path(".cache/narrative")
+CACHE_ENABLED = os.environ.get("NARRATIVE_COMPRESSOR_CACHE") == "1"
+
+# Hashed once at import instead of folding the whole prompt into every key
+_SYSTEM_PROMPT_HASH = hashlib.blake2b(SYSTEM_PROMPT.encode("utf-8"), digest_size=8).hexdigest()
+
+def _cache_path(payload: Dict[str, Any]) -> Path:
+    """Cache location for one (model, system prompt, payload) combination"""
+    key_source = json.dumps({"m": NARRATIVE_COMPRESSION_MODEL, "u": payload}, sort_keys=True)
+    return CACHE_DIR / _SYSTEM_PROMPT_HASH / f"{hashlib.sha256(key_source.encode('utf-8')).hexdigest()}.json"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_QUOTE_TABLE = str.maketrans({"\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"'})
+
+def normalize_narrative(narrative: str) -> str:
+    """Collapse editor noise (whitespace runs, line wrapping, smart quotes, NFKC forms)"""
+    text = unicodedata.normalize("NFKC", narrative).translate(_QUOTE_TABLE)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+def _normalized_cache_path(payload: Dict[str, Any]) -> Path:
+    """Secondary cache location that ignores whitespace/quote differences in the passage"""
+    return _cache_path({**payload, "PASSAGE": normalize_narrative(payload["PASSAGE"])})
+
+def _read_cached(cache_file: Path) -> Optional[Dict[str, Any]]:
+    """Return a previously stored response, or None if absent/unreadable"""
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"WARNING: Ignoring unreadable cache file {cache_file}: {e}")
+        return None
+
+def _write_cached(cache_file: Path, result: Dict[str, Any]):
+    """Store a response atomically; cache failures never fail the compression"""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # Unique temp name so concurrent writers of the same key never share a file
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=cache_file.parent,
+                                         suffix=".tmp", delete=False) as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(f.name, cache_file)
+    except Exception as e:
+        print(f"WARNING: Could not write cache file {cache_file}: {e}")
+
+def prune_stale_cache() -> int:
+    """Delete cache subtrees written under previous system prompts; returns how many were removed"""
+    if not CACHE_DIR.is_dir():
+        return 0
+    removed = 0
+    for entry in CACHE_DIR.iterdir():
+        if entry.is_dir() and entry.name != _SYSTEM_PROMPT_HASH:
+            shutil.rmtree(entry, ignore_errors=True)
+            removed += 1
+    return removed
+
+# Upper bound for the serialized user payload. Long campaigns accumulate canon
+# blocks, so the oldest ones are dropped before sending rather than letting the
+# request overflow the context window (estimated at CHARS_PER_TOKEN without tiktoken)
+PAYLOAD_TOKEN_BUDGET = 60000
+CHARS_PER_TOKEN = 4
+
+@lru_cache(maxsize=1)
+def _token_encoder():
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(NARRATIVE_COMPRESSION_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(f"WARNING: Could not load tiktoken encoding, estimating tokens by characters: {e}")
+        return None
+
+def _count_tokens(obj: Any) -> int:
+    text = _json_dumps(obj)
+    encoder = _token_encoder()
+    if encoder is None:
+        return len(text) // CHARS_PER_TOKEN
+    return len(encoder.encode(text, disallowed_special=()))
+
+def prune_canon_to_budget(payload: Dict[str, Any], budget: int = PAYLOAD_TOKEN_BUDGET) -> Dict[str, Any]:
+    """Return payload with the oldest CANON blocks dropped until it fits the token budget"""
+    canon = payload["CANON"]
+    blocks = canon.get("blocks") or []
+    total = _count_tokens(payload)
+    if total < budget or not blocks:
+        return payload
+    
+    # Subtract each dropped block's cost (plus its separator) instead of re-encoding the payload
+    drop = 0
+    while drop < len(blocks) and total >= budget:
+        total -= _count_tokens(blocks[drop]) + 1
+        drop += 1
+    print(f"WARNING: Payload over {budget} tokens, dropped {drop} oldest canon block(s)")
+    return {**payload, "CANON": {**canon, "blocks": blocks[drop:]}}
+
+# Structured Outputs: the API constrains decoding to this schema, so replies are
+# always parseable JSON without markdown fences. Strict mode cannot express
+# free-form maps, so codebook tables travel as [{"id", "name"}] lists and are
+# folded back into the documented {"id": "name"} maps after parsing.
+USE_STRUCTURED_OUTPUT = True
+
+_STRINGS = {"type": "array", "items": {"type": "string"}}
+# Block text layout enforced during decoding: @C and @L tables, optional further
+# tables, then exactly one EVT block of "n) <marker> <action...>." beats. This
+# is the beat rule validate_block_text_minimal checks, so malformed beats
+# cannot be sampled and need no repair round trip.
+SLIMLINE_TEXT_PATTERN = (
+    r"^@C=[^\n]*\n@L=[^\n]*\n(?:@[A-Z]=[^\n]*\n|\n)*"
+    r"EVT\[\n(?:[0-9]+\) (?:@L[0-9]+|->L[0-9]+|<-L[0-9]+) [^\n]*\.\n)+\]\n?$"
+)
+_CODEBOOK_TABLE = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {"id": {"type": "string"}, "name": {"type": "string"}},
+        "required": ["id", "name"],
+        "additionalProperties": False
+    }
+}
+SLIMLINE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "version": {"type": "string"},
+        "ops": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "action": {"type": "string", "enum": ["match_update", "create"]},
+                    "block_id": {"type": "string"},
+                    "reason": {"type": "string"}
+                },
+                "required": ["action", "block_id", "reason"],
+                "additionalProperties": False
+            }
+        },
+        "codebook": {
+            "type": "object",
+            "properties": {"C": _CODEBOOK_TABLE, "L": _CODEBOOK_TABLE, "S": _CODEBOOK_TABLE},
+            "required": ["C", "L", "S"],
+            "additionalProperties": False
+        },
+        "blocks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "block_id": {"type": "string"},
+                    "signature": {
+                        "type": "object",
+                        "properties": {"L": _STRINGS, "C": _STRINGS},
+                        "required": ["L", "C"],
+                        "additionalProperties": False
+                    },
+                    "text": {"type": "string", "pattern": SLIMLINE_TEXT_PATTERN}
+                },
+                "required": ["block_id", "signature", "text"],
+                "additionalProperties": False
+            }
+        },
+        "validation": {
+            "type": "object",
+            "properties": {"errors": _STRINGS, "warnings": _STRINGS},
+            "required": ["errors", "warnings"],
+            "additionalProperties": False
+        }
+    },
+    "required": ["version", "ops", "codebook", "blocks", "validation"],
+    "additionalProperties": False
+}
+SLIMLINE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "Slimline", "strict": True, "schema": SLIMLINE_SCHEMA}
+}
+
+def _codebook_to_maps(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert structured-output codebook lists back to {"id": "name"} maps"""
+    codebook = result.get("codebook")
+    if isinstance(codebook, dict):
+        for table, entries in codebook.items():
+            if isinstance(entries, list):
+                codebook[table] = {e["id"]: e["name"] for e in entries if isinstance(e, dict) and "id" in e}
+    return result
+
+def _stream_completion(request: Dict[str, Any]):
+    """
+    Run a chat completion as a stream, collecting content deltas as they arrive
+    
+    Returns (content, usage_chunk); the final chunk carries usage because of
+    include_usage, and is None if the stream ended without one.
+    """
+    parts = []
+    usage_chunk = None
+    stream = client.chat.completions.create(**request, stream=True, stream_options={"include_usage": True})
+    for chunk in stream:
+        if chunk.choices:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+        if getattr(chunk, "usage", None) is not None:
+            usage_chunk = chunk
+    return "".join(parts), usage_chunk
+
+def _log_prompt_cache(response):
+    """Report how much of the prompt was served from the provider's prefix cache"""
+    usage = getattr(response, "usage", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None)
+    if cached is not None:
+        print(f"Prompt cache: {cached}/{usage.prompt_tokens} prompt tokens cached")
+
+# User-role feedback for a retry; never a system message, so the cached prefix holds
+_RETRY_HINT = json.dumps({
+    "instruction": "Re-emit fixing the format issue. Ensure exactly one EVT block."
+})
+
+# Optional ```/```json fences around a reply; group 1 is the stripped body
+_FENCE_RE = re.compile(r"^\s*(?:```(?:json)?)?\s*(.*?)\s*(?:```)?\s*$", re.S)
+
+# Beat validation patterns, compiled once; beats are checked with re2 when installed
+_EVT_RE = re.compile(r"EVT\[(.*)\]", re.S)
+_BEAT_PATTERN = r"^\d+\)\s+(?:@L\d+|->L\d+|<-L\d+)\s+.*\.$"
+_BEAT_RE = re2.compile(_BEAT_PATTERN) if RE2_AVAILABLE else re.compile(_BEAT_PATTERN)
+
 def validate_block_text_minimal(t: str) -> List[str]:
     """Minimal validation - relaxed for prose-enhanced beats"""
     errs = []
@@ -162,12 +446,13 @@ def validate_block_text_minimal(t: str) -> List[str]:
         errs.append("MISSING_REQUIRED_TABLES")
     
     # Allow prose in beats - just check basic structure
-    evt = re.search(r"EVT\[(.*)\]", t, flags=re.S)
+    evt = _EVT_RE.search(t)
     if evt:
-        for line in [x.strip() for x in evt.group(1).splitlines() if x.strip()]:
+        for line in evt.group(1).splitlines():
+            line = line.strip()
             # Must start with "n) <marker>" and end with period
             # Allow any content between marker and period (including prose)
-            if not re.match(r"^\d+\)\s+(?:@L\d+|->L\d+|<-L\d+)\s+.*\.$", line):
+            if line and not _BEAT_RE.match(line):
                 errs.append("BEAT_MALFORMED")
                 break
     
@@ -210,51 +495,65 @@ def compress_with_ai(narrative: str, canon: Dict[str, Any] = None, mode: str = "
             "min_party_occurrences": 2
         }
     }
+    payload = prune_canon_to_budget(payload)
+    
+    # Exact-match key first, then the normalized-passage key (same file if already normalized)
+    cache_files = []
+    if CACHE_ENABLED:
+        cache_files = list(dict.fromkeys([_cache_path(payload), _normalized_cache_path(payload)]))
+    for cache_file in cache_files:
+        cached = _read_cached(cache_file)
+        if cached is not None:
+            return cached
     
-    max_retries = 1  # Keep retries minimal for agentic approach
+    # Schema-constrained replies are always well-formed, so only the plain
+    # JSON path (models without Structured Outputs) keeps its one repair retry
+    max_retries = 0 if USE_STRUCTURED_OUTPUT else 1
+    
+    # Serialized once for all attempts; raw UTF-8 is shorter than \u escapes
+    user_payload_str = _json_dumps(payload)
     
     for attempt in range(max_retries + 1):
         try:
             # Build messages
             messages = [
                 {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": json.dumps(payload)}
+                {"role": "user", "content": user_payload_str}
             ]
             
             # If this is a retry, add minimal feedback
             if attempt > 0:
-                messages.append({"role": "user", "content": json.dumps({
-                    "instruction": "Re-emit fixing the format issue. Ensure exactly one EVT block."
-                })})
+                messages.append({"role": "user", "content": _RETRY_HINT})
             
-            response = client.chat.completions.create(
-                model=NARRATIVE_COMPRESSION_MODEL,
-                messages=messages,
-                temperature=0.1,
-                top_p=1
-            )
+            request = {
+                "model": NARRATIVE_COMPRESSION_MODEL,
+                "messages": messages,
+                "temperature": 0.1,
+                "top_p": 1
+            }
+            if USE_STRUCTURED_OUTPUT:
+                request["response_format"] = SLIMLINE_RESPONSE_FORMAT
+            ai_output, response = _stream_completion(request)
             
             # Track token usage
-            if USAGE_TRACKING_AVAILABLE:
-                try:
-                    track_response(response)
-                except:
-                    pass  # Silently ignore tracking errors
-            
-            # Extract and parse the response
-            ai_output = response.choices[0].message.content
+            if response is not None:
+                if USAGE_TRACKING_AVAILABLE:
+                    try:
+                        track_response(response)
+                    except:
+                        pass  # Silently ignore tracking errors
+                _log_prompt_cache(response)
             
-            # Strip markdown formatting if present
-            if ai_output.startswith("```json"):
-                ai_output = ai_output[7:]  # Remove ```json
-            elif ai_output.startswith("```"):
-                ai_output = ai_output[3:]  # Remove ```
-            if ai_output.endswith("```"):
-                ai_output = ai_output[:-3]  # Remove trailing ```
-            
-            result = json.loads(ai_output.strip())
+            # Parse the response            
+            if USE_STRUCTURED_OUTPUT:
+                # Schema-constrained: plain JSON, no fences to strip
+                result = _codebook_to_maps(_json_loads(ai_output))
+            else:
+                # Strip markdown fences (and surrounding whitespace) if present
+                result = _json_loads(_FENCE_RE.match(ai_output).group(1))
             
             # Minimal validation - just check structure
+            violations = []
             if result and "blocks" in result and result["blocks"]:
                 block_text = result["blocks"][0].get("text", "")
                 violations = validate_block_text_minimal(block_text)
@@ -263,6 +562,10 @@ def compress_with_ai(narrative: str, canon: Dict[str, Any] = None, mode: str = "
                     print(f"Format issue detected: {violations}, retrying...")
                     continue
             
+            # Replies still failing validation are returned but not cached, so a later run retries them
+            if result and not violations:
+                for cache_file in cache_files:
+                    _write_cached(cache_file, result)
             return result
             
         except json.JSONDecodeError as e:
@@ -276,6 +579,229 @@ def compress_with_ai(narrative: str, canon: Dict[str, Any] = None, mode: str = "
     
     return None
 
+# Concurrent requests for compress_batch; the shared client pools connections
+BATCH_MAX_WORKERS = 8
+
+def compress_batch(narratives: List[str], canon: Dict[str, Any] = None, mode: str = "agentic",
+                   max_workers: int = BATCH_MAX_WORKERS) -> List[Optional[Dict[str, Any]]]:
+    """
+    Compress several passages concurrently, overlapping their API round trips
+    
+    Returns one compress_with_ai result (or None) per narrative, in input order.
+    """
+    if not narratives:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(narratives))) as executor:
+        return list(executor.map(lambda n: compress_with_ai(n, canon, mode), narratives))
+
+# Long passages are split on paragraph breaks into windows of about CHUNK_TOKENS
+# tokens and compressed concurrently; every call reuses the cached system prompt
+CHUNK_TOKENS = 500
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_TABLE_LINE_RE = re.compile(r"^@([A-Z])=\{(.*)\}$")
+_RELATION_RE = re.compile(r"(\w+):\(([^)]*)\)")
+_RELATION_WORD_RE = re.compile(r"[a-z]+")
+_GENERIC_RELATION_KEY_RE = re.compile(r"r\d+")
+_LOC_REF_RE = re.compile(r"(@L|->L|<-L)(\d+)")
+_WITH_RE = re.compile(r"with:(\d+(?:,\s*\d+)*)")
+_ID_RE = re.compile(r"\d+")
+
+def split_passage(narrative: str, chunk_tokens: int = CHUNK_TOKENS) -> List[str]:
+    """Group paragraphs into windows of roughly chunk_tokens tokens (never splits a paragraph)"""
+    limit = chunk_tokens * CHARS_PER_TOKEN
+    chunks = []
+    current = []
+    size = 0
+    for para in _PARAGRAPH_RE.split(narrative.strip()):
+        if current and size + len(para) > limit:
+            chunks.append("\n\n".join(current))
+            current = []
+            size = 0
+        current.append(para)
+        size += len(para)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+def _merge_codebook_table(table: Dict[str, str], entries: Dict[str, str]) -> Dict[str, str]:
+    """Add entries to table, reusing IDs for exact name matches; returns old ID -> merged ID"""
+    by_name = {name: table_id for table_id, name in table.items()}
+    next_id = max((int(i) for i in table if i.isdigit()), default=0) + 1
+    remap = {}
+    for old_id, name in entries.items():
+        merged_id = by_name.get(name)
+        if merged_id is None:
+            merged_id = str(next_id)
+            next_id += 1
+            table[merged_id] = name
+            by_name[name] = merged_id
+        remap[str(old_id)] = merged_id
+    return remap
+
+def _remap_ids(text: str, remap: Dict[str, str]) -> str:
+    return _ID_RE.sub(lambda m: remap.get(m.group(), m.group()), text)
+
+def _id_sort_key(table_id: str):
+    """Numeric IDs in numeric order, then any non-digit IDs by name"""
+    return (0, int(table_id), "") if table_id.isdigit() else (1, 0, table_id)
+
+def _relation_kind(key: str, body: str) -> Optional[str]:
+    """'romance' or 'party' for shorthand (romance:(1,2)) or canonical (r1:(1 romance 2)) relations"""
+    if key in ("romance", "party"):
+        return key
+    words = _RELATION_WORD_RE.findall(body)
+    for kind in ("romance", "party"):
+        if kind in words:
+            return kind
+    return None
+
+def _merge_relations(relations: List[Tuple[str, str]]) -> List[str]:
+    """
+    Merge (key, body) relations from every chunk, bodies already on merged IDs
+    
+    Keeps at most one romance (the most frequent pair) and one party (the most
+    frequent group, larger wins ties), drops exact duplicates, and renumbers
+    canonical r<n> keys so keys from different chunks cannot collide.
+    """
+    counts = {"romance": Counter(), "party": Counter()}
+    first_seen = {}
+    others = []
+    for key, body in relations:
+        kind = _relation_kind(key, body)
+        if kind is None:
+            others.append((key, body))
+            continue
+        members = frozenset(_ID_RE.findall(body))
+        counts[kind][members] += 1
+        first_seen.setdefault((kind, members), (key, body))
+    
+    merged = []
+    for kind, counter in counts.items():
+        if counter:
+            # max() keeps the first-seen group on ties
+            members = max(counter, key=lambda m: (counter[m], len(m) if kind == "party" else 0))
+            merged.append(first_seen[(kind, members)])
+    merged.extend(dict.fromkeys(others))
+    
+    lines = []
+    generic = 0
+    for key, body in merged:
+        if _GENERIC_RELATION_KEY_RE.fullmatch(key):
+            generic += 1
+            key = f"r{generic}"
+        lines.append(f"{key}:({body})")
+    return lines
+
+def merge_chunk_results(results: List[Dict[str, Any]], canon: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Merge per-chunk compressions into one response with a single block
+    
+    Codebooks are unioned on top of the canon codebook by exact name, every
+    chunk's location markers, with: lists and relation members are rewritten
+    to the merged IDs, and beats are concatenated and renumbered 1..N. The
+    merged block keeps the first chunk's block_id and a single op (the first
+    chunk's op type) for it. Relations are reduced to one romance and one
+    party as the prompt requires.
+    """
+    base = (canon or {}).get("codebook", {})
+    codebook = {kind: dict(base.get(kind, {})) for kind in ("C", "L", "S")}
+    used = {kind: [] for kind in ("C", "L", "S")}
+    extra_tables = {}
+    relations = []
+    beats = []
+    signature = {"L": [], "C": []}
+    warnings = []
+    errors = []
+    
+    for result in results:
+        remaps = {}
+        for kind in ("C", "L", "S"):
+            remaps[kind] = _merge_codebook_table(codebook[kind], result.get("codebook", {}).get(kind, {}))
+            used[kind].extend(remaps[kind].values())
+        c_map, l_map = remaps["C"], remaps["L"]
+        
+        block = result["blocks"][0]
+        for kind, remap in (("L", l_map), ("C", c_map)):
+            signature[kind].extend(remap.get(str(i), str(i)) for i in block.get("signature", {}).get(kind, []))
+        
+        text = block.get("text", "")
+        for line in text.splitlines():
+            table = _TABLE_LINE_RE.match(line.strip())
+            if not table or table.group(1) in codebook:
+                continue
+            if table.group(1) == "R":
+                relations.extend((key, _remap_ids(body, c_map))
+                                 for key, body in _RELATION_RE.findall(table.group(2)))
+            else:
+                tokens = extra_tables.setdefault(table.group(1), [])
+                tokens.extend(t.strip() for t in table.group(2).split(",") if t.strip())
+        
+        evt = _EVT_RE.search(text)
+        for line in (evt.group(1).splitlines() if evt else []):
+            line = line.strip()
+            if line[:1] not in _DIGITS:
+                continue
+            line = _LOC_REF_RE.sub(lambda m: m.group(1) + l_map.get(m.group(2), m.group(2)), line)
+            line = _WITH_RE.sub(lambda m: "with:" + _remap_ids(m.group(1), c_map), line)
+            beats.append(f"{len(beats) + 1}){line.split(')', 1)[1]}")
+        
+        validation = result.get("validation") or {}
+        errors.extend(validation.get("errors", []))
+        warnings.extend(validation.get("warnings", []))
+    
+    # Tables list only IDs the chunks referenced, in ID order
+    lines = []
+    for kind in ("C", "L", "S"):
+        ids = sorted(set(used[kind]), key=_id_sort_key)
+        if ids or kind != "S":
+            lines.append(f"@{kind}={{" + ",".join(f"{i}:{codebook[kind][i]}" for i in ids) + "}")
+    for kind, tokens in extra_tables.items():
+        lines.append(f"@{kind}={{" + ",".join(dict.fromkeys(tokens)) + "}")
+    if relations:
+        lines.append("@R={" + ", ".join(_merge_relations(relations)) + "}")
+    text = "\n".join(lines) + "\n\nEVT[\n" + "\n".join(beats) + "\n]\n"
+    
+    # One block is emitted, so one op describes it: the first chunk's op type,
+    # retargeted at the merged block_id (other chunks' ops name blocks that don't exist)
+    first = results[0]
+    block_id = first["blocks"][0].get("block_id")
+    first_ops = first.get("ops", [])
+    op = next((o for o in first_ops if o.get("block_id") == block_id), first_ops[0] if first_ops else None)
+    ops = [dict(op, block_id=block_id)] if op else []
+    
+    return {
+        "version": first.get("version", "1.0"),
+        "ops": ops,
+        "codebook": codebook,
+        "blocks": [{
+            "block_id": block_id,
+            "signature": {kind: list(dict.fromkeys(ids)) for kind, ids in signature.items()},
+            "text": text
+        }],
+        "validation": {"errors": errors, "warnings": warnings}
+    }
+
+def compress_chunked(narrative: str, canon: Dict[str, Any] = None, mode: str = "agentic",
+                     chunk_tokens: int = CHUNK_TOKENS,
+                     max_workers: int = BATCH_MAX_WORKERS) -> Optional[Dict[str, Any]]:
+    """
+    Compress a long passage as concurrent paragraph-window calls merged into one block
+    
+    All windows see the same canon, so names already in canon keep their IDs;
+    new names are reconciled across windows by exact match while merging.
+    Returns None if any window fails.
+    """
+    chunks = split_passage(narrative, chunk_tokens)
+    if len(chunks) <= 1:
+        return compress_with_ai(narrative, canon, mode)
+    
+    results = compress_batch(chunks, canon, mode, max_workers)
+    if not all(r and r.get("blocks") for r in results):
+        print("ERROR: One or more passage chunks failed to compress")
+        return None
+    return merge_chunk_results(results, canon)
+
 def extract_compressed_text(ai_response: Dict[str, Any]) -> str:
     """Extract just the compressed text from the AI response"""
     if not ai_response or "blocks" not in ai_response:
@@ -288,20 +814,26 @@ def extract_compressed_text(ai_response: Dict[str, Any]) -> str:
     # Return the text from the first (and likely only) block
     return blocks[0].get("text", "")
 
+_DIGITS = frozenset('0123456789')
+
 def post_merge_duplicates(text: str) -> str:
-    """Optional: Post-process to merge exact duplicate beats"""
-    lines = text.split('\n')
+    """Optional: Post-process to merge exact duplicate beats inside the EVT block"""
+    evt = _EVT_RE.search(text)
+    if not evt:
+        return text
     result = []
     seen = set()
     
-    for line in lines:
+    for line in evt.group(1).split('\n'):
         # Skip if exact duplicate beat (same marker, action, with:)
-        if line.startswith(tuple('0123456789')) and line in seen:
-            continue
-        seen.add(line)
+        if line[:1] in _DIGITS:
+            if line in seen:
+                continue
+            seen.add(line)
         result.append(line)
     
-    return '\n'.join(result)
+    # Splice the deduplicated beats back between the untouched tables and tail
+    return text[:evt.start(1)] + '\n'.join(result) + text[evt.end(1):]
 
 def main():
     # Built-in test narrative (same as before)
@@ -343,7 +875,7 @@ Thus, the tale of Marrow's Rest unfolds--a saga not merely of monsters and magic
     print("-" * 60)
     
     # Call the AI with agentic mode
-    result = compress_with_ai(text, mode="agentic")
+    result = compress_chunked(text, mode="agentic")
     
     if result:
         # Extract the compressed text
@@ -355,20 +887,21 @@ Thus, the tale of Marrow's Rest unfolds--a saga not merely of monsters and magic
         # Print the compressed output
         print(compressed_text)
         
-        # Save full response for analysis
-        with open("ai_compression_agentic_response.json", "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2)
+        # Save full response for analysis (pretty JSON written straight as UTF-8 bytes)
+        Path("ai_compression_agentic_response.json").write_bytes(_json_pretty_bytes(result))
         
         # Save just the compressed text for comparison
-        with open("ai_compression_agentic_output.txt", "w", encoding="utf-8") as f:
-            f.write("AI NARRATIVE COMPRESSION OUTPUT (GPT-4.1-mini Agentic)\n")
-            f.write("=" * 60 + "\n\n")
-            f.write(compressed_text)
-            f.write("\n\n" + "=" * 60 + "\n")
-            f.write(f"Original length: {len(text)} chars\n")
-            f.write(f"Compressed length: {len(compressed_text)} chars\n")
-            if len(text) > 0:
-                f.write(f"Reduction: {(1 - len(compressed_text)/len(text))*100:.1f}%\n")
+        report = [
+            "AI NARRATIVE COMPRESSION OUTPUT (GPT-4.1-mini Agentic)\n",
+            "=" * 60 + "\n\n",
+            compressed_text,
+            "\n\n" + "=" * 60 + "\n",
+            f"Original length: {len(text)} chars\n",
+            f"Compressed length: {len(compressed_text)} chars\n",
+        ]
+        if len(text) > 0:
+            report.append(f"Reduction: {(1 - len(compressed_text)/len(text))*100:.1f}%\n")
+        Path("ai_compression_agentic_output.txt").write_text("".join(report), encoding="utf-8")
         
         print("\n" + "-" * 60)
         print(f"Saved AI response to: ai_compression_agentic_response.json")
@@ -7,16 +7,29 @@ Location module compression for RPG game
 Compresses location JSON into compact structured format
 """
 
+import asyncio
 import json
+import os
 import re
-from typing import Dict, Any, List, Optional
-from openai import OpenAI
+import hashlib
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+from openai import OpenAI, AsyncOpenAI, BadRequestError
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
 
 # Load configuration
 try:
     import config
     from model_config import LOCATION_COMPRESSION_MODEL
     client = OpenAI(api_key=config.OPENAI_API_KEY)
+    async_client = AsyncOpenAI(api_key=config.OPENAI_API_KEY)
 except ImportError:
     raise ImportError("Missing config.py or model_config.py")
 
@@ -106,6 +119,116 @@ Beats (EVT) format:
 • End every beat with a period
 """
 
+EXAMPLE_FORMAT = """CRITICAL FORMAT REQUIREMENTS:
+@C must use format: {1:Firstname,2:Othername} NOT {1:Title_Firstname,2:Role_Name}
+@L must be present: {1:Location_Name}
+@S must include ALL mentioned spells: {1:Aid,2:Guidance} if any spells appear
+@R must include romance if bond beats exist: {romance:(id1,id2),party:(ids)}
+@NPCROLES maps NPC IDs to roles: {1:elder,2:captain,4:proprietor}
+
+Remove ALL role prefixes: "Kira" not "Scout_Kira", "Dorun" not "Elder_Dorun", "Thane" not "Ranger_Thane"
+
+This is a LOCATION MODULE requiring all location tables. The user message is the location data to compress."""
+
+# Everything invariant lives in one system message sent first on every call, so the
+# provider's automatic prefix cache serves it; the user message is only the location JSON
+_STATIC_SYSTEM = LOCATION_SYSTEM_PROMPT + "\n\n" + EXAMPLE_FORMAT
+
+# Anthropic models (served through an OpenAI-compatible endpoint) only cache behind
+# an explicit breakpoint, so the static block is marked ephemeral for them
+_EXPLICIT_CACHE_MODEL_PREFIXES = ("claude", "anthropic.")
+
+def _system_message(text: str) -> Dict[str, Any]:
+    if LOCATION_COMPRESSION_MODEL.startswith(_EXPLICIT_CACHE_MODEL_PREFIXES):
+        return {"role": "system", "content": [
+            {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+        ]}
+    return {"role": "system", "content": text}
+
+_SYSTEM_MESSAGE = _system_message(_STATIC_SYSTEM)
+
+# Batch requests append one instruction after the shared prefix, so they still hit its cache
+BATCH_ADDENDUM = """BATCH MODE: The user message contains several locations, each introduced by a line "===LOC n===". Compress each location independently and emit its block after a line "===OUT n===" with the same n, in order, with nothing else between blocks."""
+_BATCH_SYSTEM_MESSAGE = _system_message(_STATIC_SYSTEM + "\n\n" + BATCH_ADDENDUM)
+# Markdown fences around a reply
+_MD_OPEN = re.compile(r'^```[a-z]*\n')
+_MD_CLOSE = re.compile(r'\n```$')
+
+_BATCH_OUT_RE = re.compile(r"^===OUT (\d+)===[ \t]*$", re.M)
+
+# Locations packed into one batch request, bounded by count and by input tokens
+# (LOCATION_BATCH_TOKENS * CHARS_PER_TOKEN characters when tiktoken is not installed)
+LOCATION_BATCH_SIZE = 6
+LOCATION_BATCH_TOKENS = 24000
+CHARS_PER_TOKEN = 4
+
+_ENCODER = None
+if TIKTOKEN_AVAILABLE:
+    try:
+        try:
+            _ENCODER = tiktoken.encoding_for_model(LOCATION_COMPRESSION_MODEL)
+        except KeyError:
+            _ENCODER = tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(f"WARNING: Could not load tiktoken encoding, sizing batches by characters: {e}")
+
+def _count_tokens(text: str) -> int:
+    if _ENCODER is None:
+        return len(text) // CHARS_PER_TOKEN
+    return len(_ENCODER.encode(text, disallowed_special=()))
+
+# Stable per-prompt routing hint so repeat calls land where the prefix is cached
+_PROMPT_HASH = hashlib.sha256(_STATIC_SYSTEM.encode("utf-8")).hexdigest()[:16]
+_PROMPT_CACHE_USER = "location-compressor-" + _PROMPT_HASH
+
+# Compressed blocks are cached on disk by content hash. The key covers the prompt
+# text, the model and the canonicalized location JSON; bump PROMPT_VERSION when
+# output handling changes without a prompt edit.
+PROMPT_VERSION = "v3"
+CACHE_DIR = Path(".cache/location_compression")
+
+# Client-side output check, run before accepting a reply: every listed section must be
+# present, and a table must be non-empty when the source location has entries for it.
+# A failing reply is retried with the problems fed back instead of being returned as is.
+REQUIRED_SECTIONS = ("@C", "@L", "@F", "@TRANS", "@DOORS", "@DC", "@LOOT", "@HOOKS", "@AREA", "@NPCROLES")
+NONEMPTY_IF_SOURCE_HAS = {
+    "@C": "npcs",
+    "@NPCROLES": "npcs",
+    "@F": "features",
+    "@TRANS": "connectivity",
+    "@DOORS": "doors",
+    "@DC": "dcChecks",
+    "@LOOT": "lootTable",
+    "@HOOKS": "plotHooks",
+    "@AREA": "areaConnectivity",
+}
+_SECTION_RES = {
+    name: re.compile(rf"^{re.escape(name)}=\{{(.*)\}}[ \t]*$", re.M)
+    for name in set(REQUIRED_SECTIONS) | set(NONEMPTY_IF_SOURCE_HAS)
+}
+
+def validate_location_block(compressed: str, source: Any) -> List[str]:
+    """Return problems with a compressed block (missing/empty sections); [] when it passes"""
+    problems = []
+    for name in REQUIRED_SECTIONS:
+        if not _SECTION_RES[name].search(compressed):
+            problems.append(f"missing {name}")
+    if "EVT[" not in compressed:
+        problems.append("missing EVT[...] block")
+    if isinstance(source, dict):
+        for name, field in NONEMPTY_IF_SOURCE_HAS.items():
+            table = _SECTION_RES[name].search(compressed)
+            if table and not table.group(1).strip() and source.get(field):
+                problems.append(f"{name} is empty but the location has {field}")
+    return problems
+
+def _source_validator(location_json_str: str) -> Callable[[str], List[str]]:
+    try:
+        source = json.loads(location_json_str)
+    except ValueError:
+        source = None
+    return lambda compressed: validate_location_block(compressed, source)
+
 def compress_location(location_json_str: str, max_retries: int = 2) -> Optional[str]:
     """
     Compress location JSON using GPT model with validation and retries
@@ -118,62 +241,329 @@ def compress_location(location_json_str: str, max_retries: int = 2) -> Optional[
         Compressed location string or None if failed
     """
     
-    attempts = 0
+    cache_file = _cache_path(location_json_str)
+    cached = _read_cached(cache_file)
+    if cached is not None:
+        return cached
+    
+    # Identical for every attempt so retries reuse the cached prefix
+    messages = [
+        _SYSTEM_MESSAGE,
+        {"role": "user", "content": location_json_str}
+    ]
+    validate = _source_validator(location_json_str)
+    result = _complete_with_retries(messages, max_retries, _extract_compressed, validate)
+    _cache_if_valid(cache_file, result, validate)
+    return result
+
+def _cache_path(location_json_str: str) -> Path:
+    """Cache location for one location; whitespace and key order in the JSON don't matter"""
+    try:
+        canonical = json.dumps(json.loads(location_json_str), sort_keys=True,
+                               separators=(",", ":"), ensure_ascii=False)
+    except ValueError:
+        canonical = location_json_str
+    key_source = "\n".join((PROMPT_VERSION, _PROMPT_HASH, LOCATION_COMPRESSION_MODEL, canonical))
+    key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+    return CACHE_DIR / key[:2] / key
+
+def _read_cached(cache_file: Path) -> Optional[str]:
+    """Return a previously compressed block, or None if absent/unreadable"""
+    try:
+        return cache_file.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"WARNING: Ignoring unreadable cache file {cache_file}: {e}")
+        return None
+
+def _write_cached(cache_file: Path, compressed: str):
+    """Store a compressed block atomically; cache failures never fail the compression"""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=cache_file.parent,
+                                         suffix=".tmp", delete=False) as f:
+            f.write(compressed)
+        os.replace(f.name, cache_file)
+    except Exception as e:
+        print(f"WARNING: Could not write cache file {cache_file}: {e}")
+
+def _extract_compressed(response_text: str) -> str:
+    """Strip markdown fences and unwrap a {"blocks": [...]} reply to its block text"""
+    # Remove markdown code blocks if present
+    if response_text.startswith("```"):
+        response_text = _MD_OPEN.sub('', response_text)
+        response_text = _MD_CLOSE.sub('', response_text)
     
-    while attempts <= max_retries:
+    # Try to parse as JSON first to see if it's wrapped
+    try:
+        result = json.loads(response_text)
+        if "blocks" in result and result["blocks"]:
+            return result["blocks"][0]["text"]
+        else:
+            return response_text
+    except json.JSONDecodeError:
+        # If not JSON, return the text directly
+        return response_text
+
+# Greedy decoding plus a fixed seed makes identical input yield identical output.
+# This pairs with the disk cache above: a cached block is exactly what a fresh call
+# would return, and a retry only differs when the repair feedback changes the prompt.
+COMPLETION_SEED = 42
+_seed_supported = True
+
+def _completion_kwargs(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Request arguments shared by the sync and async clients"""
+    kwargs = {
+        "model": LOCATION_COMPRESSION_MODEL,
+        "messages": messages,
+        "temperature": 0,
+        "user": _PROMPT_CACHE_USER
+    }
+    if _seed_supported:
+        kwargs["seed"] = COMPLETION_SEED
+    return kwargs
+
+def _is_seed_rejection(e: Exception) -> bool:
+    """True if the client or model refused the seed parameter"""
+    if not _seed_supported:
+        return False
+    if isinstance(e, TypeError):
+        return "seed" in str(e)
+    return isinstance(e, BadRequestError) and "seed" in str(e).lower()
+
+def _drop_seed(e: Exception):
+    global _seed_supported
+    _seed_supported = False
+    print(f"Model rejected seed, continuing without it: {e}")
+
+def _create_completion(messages: List[Dict[str, Any]]):
+    try:
+        return client.chat.completions.create(**_completion_kwargs(messages))
+    except (TypeError, BadRequestError) as e:
+        if not _is_seed_rejection(e):
+            raise
+        _drop_seed(e)
+        return client.chat.completions.create(**_completion_kwargs(messages))
+
+async def _create_completion_async(messages: List[Dict[str, Any]]):
+    try:
+        return await async_client.chat.completions.create(**_completion_kwargs(messages))
+    except (TypeError, BadRequestError) as e:
+        if not _is_seed_rejection(e):
+            raise
+        _drop_seed(e)
+        return await async_client.chat.completions.create(**_completion_kwargs(messages))
+
+def _track(response):
+    # Track token usage (including prompt tokens served from cache)
+    if USAGE_TRACKING_AVAILABLE:
         try:
-            # Build message with format requirements
-            example_format = """CRITICAL FORMAT REQUIREMENTS:
-@C must use format: {1:Firstname,2:Othername} NOT {1:Title_Firstname,2:Role_Name}
-@L must be present: {1:Location_Name}
-@S must include ALL mentioned spells: {1:Aid,2:Guidance} if any spells appear
-@R must include romance if bond beats exist: {romance:(id1,id2),party:(ids)}
-@NPCROLES maps NPC IDs to roles: {1:elder,2:captain,4:proprietor}
+            track_response(response)
+        except:
+            pass  # Silently ignore tracking errors
 
-Remove ALL role prefixes: "Kira" not "Scout_Kira", "Dorun" not "Elder_Dorun", "Thane" not "Ranger_Thane"
+def _repair_messages(messages: List[Dict[str, Any]], reply: str, problems: List[str]) -> List[Dict[str, Any]]:
+    """Original prompt (cached prefix intact) plus the rejected reply and what to fix"""
+    return messages[:2] + [
+        {"role": "assistant", "content": reply},
+        {"role": "user", "content": "Your block failed validation: " + "; ".join(problems)
+                                    + ". Re-emit the complete corrected block."}
+    ]
 
-"""
-            user_message = f"{example_format}This is a LOCATION MODULE requiring all location tables. Compress this location data:\n\n{location_json_str}"
-            
-            response = client.chat.completions.create(
-                model=LOCATION_COMPRESSION_MODEL,
-                messages=[
-                    {"role": "system", "content": LOCATION_SYSTEM_PROMPT},
-                    {"role": "user", "content": user_message}
-                ],
-                temperature=0.1  # Lower temperature for more deterministic output
-            )
-            
-            # Track token usage
-            if USAGE_TRACKING_AVAILABLE:
-                try:
-                    track_response(response)
-                except:
-                    pass  # Silently ignore tracking errors
-            
-            # Extract response
-            response_text = response.choices[0].message.content.strip()
-            
-            # Remove markdown code blocks if present
-            if response_text.startswith("```"):
-                response_text = re.sub(r'^```[a-z]*\n', '', response_text)
-                response_text = re.sub(r'\n```$', '', response_text)
-            
-            # Try to parse as JSON first to see if it's wrapped
-            try:
-                result = json.loads(response_text)
-                if "blocks" in result and result["blocks"]:
-                    return result["blocks"][0]["text"]
-                else:
-                    return response_text
-            except json.JSONDecodeError:
-                # If not JSON, return the text directly
-                return response_text
-                
+# Wait before retrying a failed call; doubles after each failure
+RETRY_BACKOFF_SECONDS = 1.0
+
+def _retry_steps(messages: List[Dict[str, Any]], max_retries: int,
+                 parse: Callable[[str], Any],
+                 validate: Optional[Callable[[Any], List[str]]] = None):
+    """
+    Retry policy shared by the sync and async callers
+    
+    Yields (messages, delay) for each attempt and is sent back the reply text,
+    or the exception the call raised. Failed calls are retried after a backoff
+    delay; invalid replies are retried (while retries remain) with repair
+    feedback. Finishes with parse(reply text), or None if every call failed.
+    """
+    delay = 0.0
+    for attempt in range(max_retries + 1):
+        outcome = yield messages, delay
+        try:
+            if isinstance(outcome, Exception):
+                raise outcome
+            result = parse(outcome)
         except Exception as e:
             print(f"Error calling OpenAI: {e}")
-            attempts += 1
-            if attempts > max_retries:
-                return None
+            delay = RETRY_BACKOFF_SECONDS * 2 ** attempt
+            continue
+        problems = validate(result) if validate and result else []
+        if problems and attempt < max_retries:
+            print(f"Location block failed validation: {problems}, retrying...")
+            messages = _repair_messages(messages, outcome, problems)
+            delay = 0.0
+            continue
+        return result
+    return None
+
+def _complete_with_retries(messages: List[Dict[str, Any]], max_retries: int,
+                           parse: Callable[[str], Any],
+                           validate: Optional[Callable[[Any], List[str]]] = None) -> Any:
+    """Send messages, retrying failed calls and (while retries remain) invalid replies;
+    returns parse(reply text) or None"""
+    steps = _retry_steps(messages, max_retries, parse, validate)
+    try:
+        messages, delay = next(steps)
+        while True:
+            if delay:
+                time.sleep(delay)
+            try:
+                response = _create_completion(messages)
+                _track(response)
+                outcome = response.choices[0].message.content.strip()
+            except Exception as e:
+                outcome = e
+            messages, delay = steps.send(outcome)
+    except StopIteration as done:
+        return done.value
+
+async def _complete_with_retries_async(messages: List[Dict[str, Any]], max_retries: int,
+                                       parse: Callable[[str], Any],
+                                       validate: Optional[Callable[[Any], List[str]]] = None,
+                                       semaphore: Optional[asyncio.Semaphore] = None) -> Any:
+    """Async _complete_with_retries; the semaphore (if any) is held only during each call"""
+    steps = _retry_steps(messages, max_retries, parse, validate)
+    try:
+        messages, delay = next(steps)
+        while True:
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                if semaphore is None:
+                    response = await _create_completion_async(messages)
+                else:
+                    async with semaphore:
+                        response = await _create_completion_async(messages)
+                _track(response)
+                outcome = response.choices[0].message.content.strip()
+            except Exception as e:
+                outcome = e
+            messages, delay = steps.send(outcome)
+    except StopIteration as done:
+        return done.value
+
+def _cache_if_valid(cache_file: Path, result: Optional[str], validate: Callable[[str], List[str]]):
+    # Blocks still failing validation are returned but not cached, so a later run retries them
+    if result and not validate(result):
+        _write_cached(cache_file, result)
+
+def _group_for_batch(location_json_strs: List[str]) -> List[List[int]]:
+    """Group input indexes so each request stays within the batch size and token budget"""
+    groups = []
+    current = []
+    tokens = 0
+    for i, location_json_str in enumerate(location_json_strs):
+        size = _count_tokens(location_json_str)
+        if current and (len(current) >= LOCATION_BATCH_SIZE or tokens + size > LOCATION_BATCH_TOKENS):
+            groups.append(current)
+            current = []
+            tokens = 0
+        current.append(i)
+        tokens += size
+    if current:
+        groups.append(current)
+    return groups
+
+def _split_batch_output(response_text: str, count: int) -> List[Optional[str]]:
+    """Split a ===OUT n=== reply into per-location blocks; missing blocks are None"""
+    blocks = [None] * count
+    parts = _BATCH_OUT_RE.split(response_text)
+    # parts = [preamble, n1, block1, n2, block2, ...]
+    for number, text in zip(parts[1::2], parts[2::2]):
+        index = int(number) - 1
+        text = text.strip()
+        if 0 <= index < count and text:
+            blocks[index] = _extract_compressed(text)
+    return blocks
+
+def compress_locations_batch(location_json_strs: List[str], max_retries: int = 2) -> List[Optional[str]]:
+    """
+    Compress several locations with one request per group of up to LOCATION_BATCH_SIZE
     
-    return None
\ No newline at end of file
+    Args:
+        location_json_strs: JSON strings of location data
+        max_retries: Maximum number of retry attempts per request
+    
+    Blocks missing from a batch reply or failing validation are redone with
+    compress_location, so only validated blocks reach the cache.
+    
+    Returns:
+        One compressed location string (or None if it failed) per input, in order
+    """
+    results = [None] * len(location_json_strs)
+    cache_files = [_cache_path(s) for s in location_json_strs]
+    pending = []
+    for i, cache_file in enumerate(cache_files):
+        results[i] = _read_cached(cache_file)
+        if results[i] is None:
+            pending.append(i)
+    
+    for group in _group_for_batch([location_json_strs[i] for i in pending]):
+        group = [pending[g] for g in group]
+        if len(group) == 1:
+            results[group[0]] = compress_location(location_json_strs[group[0]], max_retries)
+            continue
+        
+        user_message = "\n".join(
+            f"===LOC {n}===\n{location_json_strs[i]}" for n, i in enumerate(group, 1)
+        )
+        messages = [_BATCH_SYSTEM_MESSAGE, {"role": "user", "content": user_message}]
+        blocks = _complete_with_retries(messages, max_retries,
+                                        lambda text: _split_batch_output(text, len(group)))
+        for i, block in zip(group, blocks or [None] * len(group)):
+            if block and not _source_validator(location_json_strs[i])(block):
+                results[i] = block
+                _write_cached(cache_files[i], block)
+            else:
+                # Missing or invalid in the batch reply: retry on its own (validated, repaired)
+                results[i] = compress_location(location_json_strs[i], max_retries)
+    return results
+
+
+# In-flight requests allowed by compress_locations_async (keep under the org's RPM/TPM limits)
+LOCATION_ASYNC_CONCURRENCY = 8
+
+async def compress_location_async(location_json_str: str, max_retries: int = 2,
+                                  semaphore: Optional[asyncio.Semaphore] = None) -> Optional[str]:
+    """
+    Async compress_location: same cache, prompt and retries, but awaits the API call
+    
+    Args:
+        location_json_str: JSON string of location data
+        max_retries: Maximum number of retry attempts
+        semaphore: Optional limiter shared by concurrent calls
+    
+    Returns:
+        Compressed location string or None if failed
+    """
+    cache_file = _cache_path(location_json_str)
+    cached = _read_cached(cache_file)
+    if cached is not None:
+        return cached
+    
+    messages = [
+        _SYSTEM_MESSAGE,
+        {"role": "user", "content": location_json_str}
+    ]
+    validate = _source_validator(location_json_str)
+    result = await _complete_with_retries_async(messages, max_retries, _extract_compressed,
+                                                validate, semaphore)
+    _cache_if_valid(cache_file, result, validate)
+    return result
+
+async def compress_locations_async(location_json_strs: List[str], max_retries: int = 2,
+                                   concurrency: int = LOCATION_ASYNC_CONCURRENCY) -> List[Optional[str]]:
+    """Compress many locations concurrently (at most `concurrency` requests in flight), in input order"""
+    semaphore = asyncio.Semaphore(concurrency)
+    return list(await asyncio.gather(
+        *(compress_location_async(s, max_retries, semaphore) for s in location_json_strs)
+    ))
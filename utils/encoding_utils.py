@@ -79,6 +79,16 @@ CHARACTER_REPLACEMENTS = {
     '\u009C': '',    # String terminator (remove)
 }
 
+# Single-character replacements plus removal of every other control character
+# (C0 except \t\n\r, DEL and C1), applied in one str.translate pass
+_CONTROL_CHARS = [c for c in range(160) if (c < 32 and chr(c) not in '\n\r\t') or c > 126]
+SANITIZE_TABLE = {
+    **dict.fromkeys(_CONTROL_CHARS),
+    **{ord(old): new for old, new in CHARACTER_REPLACEMENTS.items() if len(old) == 1}
+}
+# Multi-character sequences (misdecoded UTF-8) that translate cannot express
+_SEQUENCE_REPLACEMENTS = [(old, new) for old, new in CHARACTER_REPLACEMENTS.items() if len(old) > 1]
+
 
 def sanitize_text(text: str) -> str:
     """
@@ -91,21 +101,12 @@ def sanitize_text(text: str) -> str:
     # First, normalize Unicode to decomposed form
     text = unicodedata.normalize('NFKD', text)
     
-    # Replace known problematic characters
-    for old_char, new_char in CHARACTER_REPLACEMENTS.items():
-        text = text.replace(old_char, new_char)
-    
-    # Remove any remaining control characters except newlines and tabs
-    cleaned = []
-    for char in text:
-        if ord(char) < 32 and char not in '\n\r\t':
-            continue  # Skip control characters
-        elif ord(char) > 126 and ord(char) < 160:
-            continue  # Skip more control characters
-        else:
-            cleaned.append(char)
-    
-    text = ''.join(cleaned)
+    # Replace known problematic sequences, then single characters and control
+    # characters in one pass
+    for old_seq, new_seq in _SEQUENCE_REPLACEMENTS:
+        if old_seq in text:
+            text = text.replace(old_seq, new_seq)
+    text = text.translate(SANITIZE_TABLE)
     
     # Final normalization to composed form
     text = unicodedata.normalize('NFC', text)
@@ -56,6 +56,7 @@ Cross-platform compatible (Windows/Unix).
 # ============================================================================
 
 import json
+import math
 import os
 import shutil
 import time
@@ -63,10 +64,59 @@ import logging
 from typing import Any, Dict, Optional
 from pathlib import Path
 
+try:
+    import orjson  # Several times faster on large module/area files; falls back to json
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+_PLAIN_JSON_SCALARS = (str, int, bool, type(None))
+
+def _orjson_safe(data: Any) -> bool:
+    """False if orjson could write data differently from json (or accept what json rejects)"""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        kind = type(value)
+        if kind is dict:
+            for key in value:
+                if type(key) is not str:
+                    return False  # json coerces these, orjson raises
+            stack.extend(value.values())
+        elif kind is list or kind is tuple:
+            stack.extend(value)
+        elif kind is float:
+            if not math.isfinite(value):
+                return False  # json writes NaN/Infinity, orjson writes null
+        elif kind not in _PLAIN_JSON_SCALARS:
+            return False  # Subclasses, enums, datetimes, dataclasses...: keep json's handling
+    return True
+
+def _dumps(data: Any) -> str:
+    """Same JSON as json.dumps(data, indent=2, ensure_ascii=False), via orjson when it can
+
+    Only float exponents are spelled differently (1e16 rather than 1e+16).
+    """
+    if ORJSON_AVAILABLE and _orjson_safe(data):
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+        except orjson.JSONEncodeError:
+            pass  # Ints beyond 64 bits: let json handle them
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+def _loads(raw: bytes) -> Any:
+    """Parse UTF-8 JSON bytes, via orjson when it can"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # NaN/Infinity literals are accepted by json; real errors re-raise below
+    return json.loads(raw.decode('utf-8'))
+
 class FileLockError(Exception):
     """Raised when unable to acquire file lock"""
     pass
@@ -180,8 +230,10 @@ class AtomicFileWriter:
                 os.makedirs(dir_path, exist_ok=True)
             
             # Write to temporary file
+            # Serialize before opening so an unserializable value leaves no partial temp file
+            content = _dumps(data)
             with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+                f.write(content)
                 f.write('\n')  # Add newline at end of file
                 f.flush()
                 # Force write to disk
@@ -250,8 +302,8 @@ class AtomicFileWriter:
                 logger.warning(f"File not found: {filepath}")
                 return None
             
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(filepath, 'rb') as f:
+                data = _loads(f.read())
                 # Suppress success messages - only log errors
                 # logger.debug(f"Successfully read {filepath}")
                 return data
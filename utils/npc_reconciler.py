@@ -1,14 +1,54 @@
 # utils/npc_reconciler.py
 
+import hashlib
 import json
 import os
 import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
 from utils.module_path_manager import ModulePathManager
 from utils.file_operations import safe_read_json, safe_write_json
 from utils.module_context import ModuleContext
 from openai import OpenAI
 from config import OPENAI_API_KEY, DM_MINI_MODEL
 
+try:
+    import ahocorasick  # pyahocorasick: single-pass multi-alias matching for rewrite_text
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Parenthesized qualifiers stripped from NPC names, e.g. "Bob (guard)" -> "Bob"
+_PAREN_RE = re.compile(r'\s*\([^)]*\)\s*')
+_WORD_CHAR_RE = re.compile(r'\w')
+
+# Area files are read, reconciled and written concurrently (I/O bound)
+RECONCILE_MAX_WORKERS = 16
+
+# Per-module record of each area file's (mtime_ns, size, canonical map hash) at its
+# last reconcile; areas whose fingerprint still matches are not re-read
+RECONCILE_MANIFEST_NAME = ".reconcile_manifest.json"
+
+# Candidate duplicate pairs confirmed per AI request
+MERGE_CONFIRM_BATCH_SIZE = 20
+
+# Structured Outputs: decoding is constrained to {"answers": [bool, ...]}, so the
+# reply always parses and holds nothing but booleans
+MERGE_CONFIRM_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "merge_answers",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"answers": {"type": "array", "items": {"type": "boolean"}}},
+            "required": ["answers"],
+            "additionalProperties": False
+        }
+    }
+}
+
 class NpcReconciler:
     """
     Ensures all NPC names in area files match their canonical names
@@ -19,6 +59,8 @@ class NpcReconciler:
         self.context_path = self.path_manager.get_context_path()
         self.context = None
         self.canonical_map = {}
+        self._canonical_map_lc = {}
+        self._alias_matcher = None  # Built on first rewrite_text call
         # --- ADD THIS LINE ---
         self.client = OpenAI(api_key=OPENAI_API_KEY)
 
@@ -29,53 +71,115 @@ class NpcReconciler:
             return False
         
         self.context = ModuleContext.load(self.context_path)
-        
-        for npc_data in self.context.npcs.values():
-            canonical_name = npc_data['name']
-            # Map the canonical name to itself
-            self.canonical_map[canonical_name] = canonical_name
-            # Map all aliases to the canonical name
-            for alias in npc_data.get('aliases', []):
-                self.canonical_map[alias] = canonical_name
+        self._build_canonical_map()
+        return True
+
+    def _build_canonical_map(self):
+        """Builds the alias -> canonical name map from the in-memory context."""
+        # Map each canonical name to itself and all its aliases to the canonical name
+        self.canonical_map = dict(
+            pair
+            for npc_data in self.context.npcs.values()
+            for pair in ((npc_data['name'], npc_data['name']),
+                         *((alias, npc_data['name']) for alias in npc_data.get('aliases', ())))
+        )
+        self._canonical_map_lc = {name.lower(): canonical for name, canonical in self.canonical_map.items()}
+        self._alias_matcher = None
         
         print(f"DEBUG: [NpcReconciler] Built canonical map with {len(self.canonical_map)} entries.")
-        return True
 
     def get_canonical_name(self, original_name: str) -> str:
         """Finds the canonical name for a given NPC name."""
+        canonical_name = self._lookup_canonical_name(original_name)
+        if canonical_name is not None:
+            return canonical_name
+        # If still not found, return the original name as a fallback
+        print(f"WARNING: [NpcReconciler] Could not find canonical name for '{original_name}'. Using original.")
+        return original_name
+
+    def _lookup_canonical_name(self, original_name: str):
+        """get_canonical_name without the warning; None when there is no match."""
         # First, try a direct match in our map
         if original_name in self.canonical_map:
             return self.canonical_map[original_name]
         
         # If not found, try matching the base name (without parentheses)
-        base_name = re.sub(r'\s*\([^)]*\)\s*', '', original_name).strip()
+        base_name = _PAREN_RE.sub('', original_name).strip()
         if base_name in self.canonical_map:
             return self.canonical_map[base_name]
-            
-        # If still not found, return the original name as a fallback
-        print(f"WARNING: [NpcReconciler] Could not find canonical name for '{original_name}'. Using original.")
-        return original_name
+        
+        # Finally, ignore capitalization differences ("elder dorun" vs "Elder Dorun")
+        return self._canonical_map_lc.get(base_name.lower())
 
-    # --- ADD THIS NEW METHOD ---
-    def _ai_confirm_merge(self, npc1_name: str, npc2_name: str) -> bool:
-        """Uses a cheap AI call to confirm if two NPCs are the same entity."""
-        prompt = f"""Are these two fantasy characters likely the same person, just described differently?
-- NPC 1: "{npc1_name}"
-- NPC 2: "{npc2_name}"
+    def _build_alias_matcher(self):
+        """Compiles every alias that differs from its canonical name into one matcher."""
+        aliases = {alias: canonical for alias, canonical in self.canonical_map.items() if alias != canonical}
+        if not aliases:
+            return None
+        if AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for alias, canonical in aliases.items():
+                automaton.add_word(alias, (len(alias), canonical))
+            automaton.make_automaton()
+            return automaton
+        # Longest aliases first so "Old Elara" wins over "Elara"
+        pattern = "|".join(re.escape(alias) for alias in sorted(aliases, key=len, reverse=True))
+        return re.compile(rf"(?<!\w)(?:{pattern})(?!\w)")
 
-Answer with only the word "true" or "false"."""
-        try:
-            response = self.client.chat.completions.create(
-                model=DM_MINI_MODEL, # Use the mini model for fast, cheap inference
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1,
-                temperature=0.0
-            )
-            answer = response.choices[0].message.content.lower().strip()
-            return answer == "true"
-        except Exception as e:
-            print(f"WARNING: [NpcReconciler] AI merge confirmation failed: {e}")
-            return False # Default to not merging if AI fails
+    def rewrite_text(self, text: str) -> str:
+        """Replaces whole-word alias mentions in free text with canonical names in a single pass.
+
+        Not used by reconcile_all_areas, which only rewrites npc name fields.
+        """
+        if self._alias_matcher is None:
+            self._alias_matcher = self._build_alias_matcher() or False
+        matcher = self._alias_matcher
+        if not matcher:
+            return text
+        if not AHOCORASICK_AVAILABLE:
+            return matcher.sub(lambda m: self.canonical_map[m.group()], text)
+
+        parts = []
+        last = 0
+        for end, (length, canonical) in matcher.iter_long(text):
+            start = end - length + 1
+            # Whole words only: "Bob" must not rewrite "Bobby"
+            if (start > 0 and _WORD_CHAR_RE.match(text, start - 1)) or _WORD_CHAR_RE.match(text, end + 1):
+                continue
+            parts.append(text[last:start])
+            parts.append(canonical)
+            last = end + 1
+        parts.append(text[last:])
+        return "".join(parts)
+
+    # --- ADD THIS NEW METHOD ---
+    def _ai_confirm_merges(self, pairs: list) -> list:
+        """Uses cheap AI calls (MERGE_CONFIRM_BATCH_SIZE pairs each) to confirm which NPC name pairs are the same entity."""
+        answers = []
+        for start in range(0, len(pairs), MERGE_CONFIRM_BATCH_SIZE):
+            batch = pairs[start:start + MERGE_CONFIRM_BATCH_SIZE]
+            listing = "\n".join(f'{n}) "{name1}" vs "{name2}"' for n, (name1, name2) in enumerate(batch, 1))
+            prompt = f"""For each numbered pair, are these two fantasy characters likely the same person, just described differently?
+{listing}"""
+            batch_answers = []
+            try:
+                response = self.client.chat.completions.create(
+                    model=DM_MINI_MODEL, # Use the mini model for fast, cheap inference
+                    messages=[
+                        {"role": "system", "content": "Answer with one boolean per pair, in order."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    response_format=MERGE_CONFIRM_RESPONSE_FORMAT,
+                    max_tokens=16 + 3 * len(batch),
+                    temperature=0.0
+                )
+                result = json.loads(response.choices[0].message.content)["answers"]
+                batch_answers = [answer is True for answer in result[:len(batch)]]
+            except Exception as e:
+                print(f"WARNING: [NpcReconciler] AI merge confirmation failed: {e}")
+            # Default to not merging when the AI fails or answers short
+            answers.extend(batch_answers + [False] * (len(batch) - len(batch_answers)))
+        return answers
 
     # --- ADD THIS NEW METHOD ---
     def _find_and_merge_semantic_duplicates(self):
@@ -85,36 +189,49 @@ Answer with only the word "true" or "false"."""
 
         print("DEBUG: [NpcReconciler] Checking for semantic duplicates...")
         npc_list = list(self.context.npcs.values())
+        names = [npc['name'] for npc in npc_list]
+        names_lc = [name.lower() for name in names]
         merged_keys = set()
         
-        for i in range(len(npc_list)):
-            for j in range(i + 1, len(npc_list)):
-                npc1 = npc_list[i]
-                npc2 = npc_list[j]
-
-                # Skip if either has already been merged
-                if npc1['name'] in merged_keys or npc2['name'] in merged_keys:
-                    continue
-
-                # Simple check: if one name is a substring of the other (e.g., "Elara" in "Old Elara")
-                # This is a good heuristic to find potential matches
-                if npc1['name'].lower() in npc2['name'].lower() or npc2['name'].lower() in npc1['name'].lower():
-                    if self._ai_confirm_merge(npc1['name'], npc2['name']):
-                        # AI confirmed they are the same. Merge npc2 into npc1.
-                        print(f"  -> AI confirmed merge: '{npc2['name']}' into '{npc1['name']}'")
-                        
-                        # Add npc2's original name and aliases to npc1's aliases
-                        npc1.setdefault('aliases', []).append(npc2['name'])
-                        npc1['aliases'].extend(npc2.get('aliases', []))
-                        npc1['aliases'] = sorted(list(set(npc1['aliases']))) # Remove duplicates
-                        
-                        # Merge appearances
-                        for appearance in npc2.get('appears_in', []):
-                            if appearance not in npc1['appears_in']:
-                                npc1['appears_in'].append(appearance)
-                        
-                        # Mark npc2 for deletion
-                        merged_keys.add(npc2['name'])
+        # Blocking: only NPCs sharing the first three letters of some name token are
+        # compared. Pairs are collected once and visited in the original i < j order.
+        blocks = defaultdict(list)
+        for index, name_lc in enumerate(names_lc):
+            for prefix in {token[:3] for token in name_lc.split()}:
+                blocks[prefix].append(index)
+        candidate_pairs = sorted({pair for members in blocks.values() for pair in combinations(members, 2)})
+        
+        # Simple check: if one name is a substring of the other (e.g., "Elara" in "Old Elara")
+        # This is a good heuristic to find potential matches
+        candidates = [
+            (i, j) for i, j in candidate_pairs
+            if names_lc[i] in names_lc[j] or names_lc[j] in names_lc[i]
+        ]
+        confirmed = self._ai_confirm_merges([(names[i], names[j]) for i, j in candidates])
+        
+        for (i, j), same in zip(candidates, confirmed):
+            npc1 = npc_list[i]
+            npc2 = npc_list[j]
+
+            # Skip if the AI rejected the pair or either has already been merged
+            if not same or npc1['name'] in merged_keys or npc2['name'] in merged_keys:
+                continue
+
+            # AI confirmed they are the same. Merge npc2 into npc1.
+            print(f"  -> AI confirmed merge: '{npc2['name']}' into '{npc1['name']}'")
+            
+            # Add npc2's original name and aliases to npc1's aliases
+            npc1.setdefault('aliases', []).append(npc2['name'])
+            npc1['aliases'].extend(npc2.get('aliases', []))
+            npc1['aliases'] = sorted(list(set(npc1['aliases']))) # Remove duplicates
+            
+            # Merge appearances
+            for appearance in npc2.get('appears_in', []):
+                if appearance not in npc1['appears_in']:
+                    npc1['appears_in'].append(appearance)
+            
+            # Mark npc2 for deletion
+            merged_keys.add(npc2['name'])
 
         # Now, remove the merged NPCs from the context
         if merged_keys:
@@ -124,6 +241,8 @@ Answer with only the word "true" or "false"."""
             print(f"DEBUG: [NpcReconciler] Merged {len(merged_keys)} duplicate NPC entries.")
             # Re-save the context file with the merged data
             self.context.save(self.context_path)
+            # Rebuild the canonical map from the merged data already in memory
+            self._build_canonical_map()
 
     def reconcile_all_areas(self):
         """Iterates through all area files and reconciles NPC names."""
@@ -133,37 +252,97 @@ Answer with only the word "true" or "false"."""
 
         # --- ADD THIS CALL ---
         # First, perform semantic merging on the context object itself
+        # (this also rebuilds the canonical map when anything was merged)
         self._find_and_merge_semantic_duplicates()
-        
-        # Second, rebuild the canonical map with the newly merged data
-        self.load_context() # This reloads the saved context and rebuilds the map
 
         area_ids = self.path_manager.get_area_ids()
         print(f"DEBUG: [NpcReconciler] Reconciling NPCs for {len(area_ids)} areas...")
+        if not area_ids:
+            return
 
-        for area_id in area_ids:
-            area_path = self.path_manager.get_area_path(area_id)
-            area_data = safe_read_json(area_path)
-            
-            if not area_data or "locations" not in area_data:
-                continue
+        manifest_path = os.path.join(self.path_manager.module_dir, RECONCILE_MANIFEST_NAME)
+        manifest = self._load_manifest(manifest_path)
+        map_hash = hashlib.blake2b(
+            json.dumps(self.canonical_map, sort_keys=True).encode('utf-8'), digest_size=16
+        ).hexdigest()
+
+        # canonical_map is only read from here on, so workers can share it
+        manifest_changed = False
+        with ThreadPoolExecutor(max_workers=min(RECONCILE_MAX_WORKERS, len(area_ids))) as executor:
+            results = executor.map(
+                lambda area_id: self._reconcile_area(area_id, map_hash, manifest.get(area_id)), area_ids
+            )
+            # Workers never print; their output is reported here, in area order
+            for area_id, (modified, fingerprint, unresolved) in zip(area_ids, results):
+                for original_name in unresolved:
+                    print(f"WARNING: [NpcReconciler] Could not find canonical name for '{original_name}'. Using original.")
+                if modified:
+                    print(f"  -> Reconciled NPC names in {area_id}.json")
+                if manifest.get(area_id) != fingerprint:
+                    manifest_changed = True
+                    if fingerprint is None:
+                        manifest.pop(area_id, None)
+                    else:
+                        manifest[area_id] = fingerprint
+
+        if manifest_changed:
+            safe_write_json(manifest_path, manifest, create_backup=False)
+
+    def _load_manifest(self, manifest_path: str) -> dict:
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            return manifest if isinstance(manifest, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"WARNING: [NpcReconciler] Ignoring unreadable manifest {manifest_path}: {e}")
+            return {}
+
+    def _reconcile_area(self, area_id: str, map_hash: str, previous: list = None):
+        """Rewrites NPC names in one area file to their canonical names.
+
+        Returns (modified, fingerprint, unresolved); fingerprint is the area's new
+        manifest entry, or None when the file could not be read or written, and
+        unresolved lists names with no canonical match (left unchanged). Runs in
+        worker threads, so it never prints.
+        """
+        area_path = self.path_manager.get_area_path(area_id)
+        try:
+            st = os.stat(area_path)
+        except OSError:
+            return False, None, []
+        fingerprint = [st.st_mtime_ns, st.st_size, map_hash]
+        if fingerprint == previous:
+            return False, previous, []
+
+        area_data = safe_read_json(area_path)
+        
+        if not area_data or "locations" not in area_data:
+            return False, (fingerprint if area_data is not None else None), []
+
+        modified = False
+        unresolved = []
+        for location in area_data.get("locations", []):
+            reconciled_npcs = []
+            for npc_entry in location.get("npcs", []):
+                original_name = npc_entry.get("name")
+                if original_name:
+                    canonical_name = self._lookup_canonical_name(original_name)
+                    if canonical_name is None:
+                        unresolved.append(original_name)
+                    elif original_name != canonical_name:
+                        npc_entry["name"] = canonical_name
+                        modified = True
+                reconciled_npcs.append(npc_entry)
+            location["npcs"] = reconciled_npcs
 
-            modified = False
-            for location in area_data.get("locations", []):
-                reconciled_npcs = []
-                for npc_entry in location.get("npcs", []):
-                    original_name = npc_entry.get("name")
-                    if original_name:
-                        canonical_name = self.get_canonical_name(original_name)
-                        if original_name != canonical_name:
-                            npc_entry["name"] = canonical_name
-                            modified = True
-                    reconciled_npcs.append(npc_entry)
-                location["npcs"] = reconciled_npcs
-
-            if modified:
-                safe_write_json(area_data, area_path)
-                print(f"  -> Reconciled NPC names in {area_id}.json")
+        if modified:
+            if not safe_write_json(area_path, area_data):
+                return modified, None, unresolved
+            st = os.stat(area_path)
+            fingerprint = [st.st_mtime_ns, st.st_size, map_hash]
+        return modified, fingerprint, unresolved
 
 def main():
     """For testing the reconciler directly."""
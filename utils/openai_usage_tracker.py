@@ -21,6 +21,8 @@ class OpenAIUsageTracker:
         self.total_completion_tokens = 0
         self.total_tokens = 0
         self.total_requests = 0
+        self.total_cached_tokens = 0  # Prompt tokens served from the provider's prefix cache
+        self.total_cache_write_tokens = 0  # Prompt tokens written to an explicit (Anthropic) cache
         
         # Sliding window for TPM/RPM (last 60 seconds)
         self.usage_history = deque()  # (timestamp, prompt_tokens, completion_tokens, total_tokens, context)
@@ -62,6 +64,12 @@ class OpenAIUsageTracker:
                 prompt_tokens = getattr(usage, 'prompt_tokens', 0)
                 completion_tokens = getattr(usage, 'completion_tokens', 0)
                 total_tokens = getattr(usage, 'total_tokens', 0)
+                details = getattr(usage, 'prompt_tokens_details', None)
+                # OpenAI reports cache reads in prompt_tokens_details; Anthropic-style usage
+                # reports cache_read_input_tokens / cache_creation_input_tokens instead
+                cached_tokens = (getattr(details, 'cached_tokens', 0)
+                                 or getattr(usage, 'cache_read_input_tokens', 0) or 0)
+                cache_write_tokens = getattr(usage, 'cache_creation_input_tokens', 0) or 0
                 
                 # Extract model from response if available
                 model = "unknown"
@@ -75,6 +83,8 @@ class OpenAIUsageTracker:
                 self.total_completion_tokens += completion_tokens
                 self.total_tokens += total_tokens
                 self.total_requests += 1
+                self.total_cached_tokens += cached_tokens
+                self.total_cache_write_tokens += cache_write_tokens
                 
                 # Track spike - individual call
                 if total_tokens > self.max_single_call_tokens:
@@ -136,13 +146,13 @@ class OpenAIUsageTracker:
                 self.endpoint_stats[endpoint]['models_used'].add(model)
                 
                 # Log telemetry entry
-                self._log_telemetry(now, prompt_tokens, completion_tokens, total_tokens, model, context)
+                self._log_telemetry(now, prompt_tokens, completion_tokens, total_tokens, model, context, cached_tokens)
                     
         except Exception as e:
             print(f"DEBUG: [TELEMETRY] Error tracking: {e}")
             traceback.print_exc()
     
-    def _log_telemetry(self, timestamp, prompt_tokens, completion_tokens, total_tokens, model, context):
+    def _log_telemetry(self, timestamp, prompt_tokens, completion_tokens, total_tokens, model, context, cached_tokens=0):
         """Log telemetry entry to file"""
         try:
             entry = {
@@ -150,6 +160,7 @@ class OpenAIUsageTracker:
                 'prompt_tokens': prompt_tokens,
                 'completion_tokens': completion_tokens,
                 'total_tokens': total_tokens,
+                'cached_tokens': cached_tokens,
                 'model': model,
                 'context': context or {},
                 'session_elapsed': str(timestamp - self.session_start)
@@ -210,6 +221,8 @@ class OpenAIUsageTracker:
                     'total_prompt_tokens': self.total_prompt_tokens,
                     'total_completion_tokens': self.total_completion_tokens,
                     'total_requests': self.total_requests,
+                    'total_cached_tokens': self.total_cached_tokens,
+                    'total_cache_write_tokens': self.total_cache_write_tokens,
                     
                     # Spike tracking
                     'max_single_call': {
@@ -1158,11 +1158,13 @@ def check_existing_images():
         existing = []
         
         if pack_dir.exists():
+            # One directory scan instead of a stat per monster
+            with os.scandir(pack_dir) as entries:
+                file_names = {entry.name for entry in entries}
+            
             for monster_id in monster_ids:
                 # Check for .jpg files only (the correct format)
-                jpg_path = pack_dir / f"{monster_id}.jpg"
-                
-                if jpg_path.exists():
+                if f"{monster_id}.jpg" in file_names:
                     existing.append(monster_id)
         
         return jsonify({
@@ -3936,19 +3938,20 @@ def update_pack_manifest_with_npcs(pack_name):
         
         # Count NPCs
         npcs_dir = os.path.join('graphic_packs', pack_name, 'npcs')
-        npc_count = 0
         npc_list = []
         
         if os.path.exists(npcs_dir):
-            for filename in os.listdir(npcs_dir):
-                if filename.endswith('.png') and not filename.endswith('_thumb.png'):
-                    npc_id = filename[:-4]  # Remove .png
-                    npc_list.append(npc_id)
-                    npc_count += 1
+            npc_list = [
+                filename[:-4]  # Remove .png
+                for filename in os.listdir(npcs_dir)
+                if filename.endswith('.png') and not filename.endswith('_thumb.png')
+            ]
+        npc_list.sort()
+        npc_count = len(npc_list)
         
         # Update manifest
         manifest['total_npcs'] = npc_count
-        manifest['npcs_included'] = sorted(npc_list)
+        manifest['npcs_included'] = npc_list
         manifest['last_modified'] = datetime.now().strftime("%Y-%m-%d")
         
         safe_write_json(manifest_path, manifest)
@@ -4411,7 +4414,7 @@ def handle_generate_unified_assets(data):
             })
             
             import asyncio
-            from utils.bestiary_updater import BestiaryUpdater
+            from utils.bestiary_updater import BestiaryUpdater, trim_module_context
             from core.toolkit.npc_generator import NPCGenerator
             from core.toolkit.monster_generator import MonsterGenerator
             from pathlib import Path
@@ -4428,8 +4431,8 @@ def handle_generate_unified_assets(data):
             bestiary_updater = BestiaryUpdater()
             npc_generator = NPCGenerator()
             
-            # Extract module context once for all descriptions
-            module_context = bestiary_updater.extract_all_area_context(module_name)
+            # Extract and trim module context once for all descriptions
+            module_context = trim_module_context(bestiary_updater.extract_all_area_context(module_name))
             
             # Phase 1: Generate descriptions for assets without them (or all if overwrite)
             overwrite = options.get('overwrite', False)